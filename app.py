@@ -1,107 +1,170 @@
 """
 Flask app for LinkedIn Bot with scheduled workflow execution
 """
-from flask import Flask, jsonify
+import logging
+from flask import Flask, request
+import orjson
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPool
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from works.llm.workflow.orchestrator import run_workflow
 from works.news_current_affairs import get_trending_topics
 import os
 from dotenv import load_dotenv
-import threading
-import traceback
+import atexit
+import multiprocessing
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 
 load_dotenv()
 
+# One timestamp per record via %(asctime)s; configured before any job can log
+logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s', level=logging.INFO)
+
 app = Flask(__name__)
-scheduler = BackgroundScheduler()
-workflow_running = False
-workflow_lock = threading.Lock()
+# Scheduler jobs only ping or hand off to EXECUTOR, so two threads are plenty.
+# Every job coalesces missed runs and never overlaps with itself.
+scheduler = BackgroundScheduler(
+    executors={'default': SchedulerThreadPool(2)},
+    job_defaults={'coalesce': True, 'max_instances': 1}
+)
+# Single worker process: runs never overlap, and the workflow's CPU work cannot
+# hold the GIL against Flask request threads. 'spawn' avoids forking a process
+# that already has scheduler and server threads running.
+EXECUTOR = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+atexit.register(lambda: EXECUTOR.shutdown(wait=False))
+current_future = None
 app_port = None
 scheduler_started = False
 
-def execute_workflow():
-    """Execute the LinkedIn workflow"""
-    global workflow_running
+# Built once and reused whenever the jobs are (re)registered
+WORKFLOW_TRIGGER = CronTrigger(hour='0,6,12,18', minute=0)
+HEALTH_PING_TRIGGER = IntervalTrigger(minutes=1)
+HEALTH_URL = os.getenv('HEALTH_URL', 'https://linkedin-agent-humanoid.onrender.com/health')
+
+# Keep-alive session so the per-minute health ping reuses its TCP/TLS connection
+SESSION = requests.Session()
+SESSION.headers.update({'Connection': 'keep-alive'})
+_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# Trending topics keyed by hour bucket ('%Y%m%d%H') so repeat runs skip the fetch
+_topics_cache = {}
+TOPICS_CACHE_MAX_AGE = timedelta(hours=6)
+
+def get_cached_topics():
+    """Return trending topics for the current hour, fetching them on a miss"""
+    now = datetime.now()
+    key = now.strftime('%Y%m%d%H')
     
-    with workflow_lock:
-        if workflow_running:
-            print(f"[{datetime.now()}] ⚠️ Workflow already running, skipping...")
-            return
-        
-        workflow_running = True
+    # Evict buckets older than the max age
+    cutoff = (now - TOPICS_CACHE_MAX_AGE).strftime('%Y%m%d%H')
+    for stale_key in [k for k in _topics_cache if k < cutoff]:
+        del _topics_cache[stale_key]
+    
+    if key in _topics_cache:
+        logging.info("📦 Using cached trending topics")
+        return _topics_cache[key]
     
+    topics = get_trending_topics()
+    if topics:
+        _topics_cache[key] = topics
+    return topics
+
+def is_workflow_running():
+    """Check whether a workflow run is currently in flight"""
+    return current_future is not None and not current_future.done()
+
+def submit_workflow():
+    """
+    Submit the workflow to the executor unless a run is already in flight.
+    Only called from the 'linkedin_workflow' job, whose max_instances=1
+    guarantees it never races with itself.
+    """
+    global current_future
+    
+    if is_workflow_running():
+        logging.warning("⚠️ Workflow already running, skipping...")
+        return False
+    
+    # Topics are resolved here so the cache lives in this process, not the worker
+    topics = get_cached_topics()
+    current_future = EXECUTOR.submit(execute_workflow, topics)
+    return True
+
+def execute_workflow(topics):
+    """Execute the LinkedIn workflow (runs in the EXECUTOR worker process)"""
     try:
-        print(f"\n[{datetime.now()}] 🚀 Starting scheduled workflow...")
-        topics = get_trending_topics()
+        logging.info("🚀 Starting scheduled workflow...")
         result = run_workflow(topics)
         
         if result:
-            print(f"[{datetime.now()}] ✅ Workflow completed: {result.get('post_urn')}")
+            logging.info("✅ Workflow completed: %s", result.get('post_urn'))
         else:
-            print(f"[{datetime.now()}] ❌ Workflow failed")
+            logging.error("❌ Workflow failed")
     except Exception as e:
-        print(f"[{datetime.now()}] ❌ Workflow error: {str(e)}")
-        traceback.print_exc()
-    finally:
-        with workflow_lock:
-            workflow_running = False
+        logging.exception("❌ Workflow error: %s", e)
+
+def jresp(obj, status=200):
+    """JSON response serialized with orjson (bytes straight into the response body)"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
 
-@app.route('/health', methods=['GET'])
+@app.route('/health', methods=['GET', 'HEAD'])
 def health():
-    """Health check endpoint"""
-    return jsonify({
+    """Health check endpoint (HEAD skips building the JSON body)"""
+    if request.method == 'HEAD':
+        return '', 200
+    
+    return jresp({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "workflow_running": workflow_running
-    }), 200
+        "workflow_running": is_workflow_running()
+    }, 200)
 
 @app.route('/start', methods=['POST', 'GET'])
 def start():
-    """Manually trigger the workflow"""
-    global workflow_running
+    """Manually trigger the workflow (pass ?refresh=1 to refetch trending topics)"""
+    if is_workflow_running():
+        return jresp({
+            "status": "error",
+            "message": "Workflow is already running"
+        }, 409)
     
-    with workflow_lock:
-        if workflow_running:
-            return jsonify({
-                "status": "error",
-                "message": "Workflow is already running"
-            }), 409
-        
-        # Start workflow in background thread
-        thread = threading.Thread(target=execute_workflow)
-        thread.daemon = True
-        thread.start()
+    if request.args.get('refresh') == '1':
+        _topics_cache.clear()
+    
+    # Fire the scheduled job now so manual runs share its overlap guards
+    scheduler.modify_job('linkedin_workflow', next_run_time=datetime.now())
     
-    return jsonify({
+    return jresp({
         "status": "started",
         "message": "Workflow triggered successfully",
         "timestamp": datetime.now().isoformat()
-    }), 200
+    }, 200)
 
 def ping_health_endpoint():
     """Ping health endpoint to keep server awake"""
-    global app_port
     try:
-        port = app_port or int(os.getenv('PORT', 5000))
-        url = f"https://linkedin-agent-humanoid.onrender.com/health"
-        response = requests.get(url, timeout=5)
+        # Must go through the public URL: only traffic via Render's proxy keeps the instance awake
+        response = SESSION.head(HEALTH_URL, timeout=5)
         if response.status_code == 200:
-            print(f"[{datetime.now()}] 💓 Health ping successful")
+            logging.info("💓 Health ping successful")
         else:
-            print(f"[{datetime.now()}] ⚠️ Health ping returned status {response.status_code}")
+            logging.warning("⚠️ Health ping returned status %s", response.status_code)
     except Exception as e:
-        print(f"[{datetime.now()}] ⚠️ Health ping failed: {str(e)}")
+        logging.warning("⚠️ Health ping failed: %s", e)
 
 def start_scheduler():
     """Start the background scheduler"""
     global app_port, scheduler_started
     
-    # Prevent multiple scheduler starts
-    if scheduler_started or scheduler.running:
+    # Prevent multiple scheduler starts (including in the spawned workflow process,
+    # which re-imports this module)
+    if scheduler_started or scheduler.running or multiprocessing.parent_process() is not None:
         return
     
     # Get port and store globally for health ping
@@ -110,17 +173,18 @@ def start_scheduler():
     # Schedule workflow to run 4 times a day (every 6 hours)
     # Times: 00:00, 06:00, 12:00, 18:00
     scheduler.add_job(
-        func=execute_workflow,
-        trigger=CronTrigger(hour='0,6,12,18', minute=0),
+        func=submit_workflow,
+        trigger=WORKFLOW_TRIGGER,
         id='linkedin_workflow',
         name='LinkedIn Post Workflow',
+        misfire_grace_time=300,
         replace_existing=True
     )
     
     # Schedule health ping every minute to keep server awake
     scheduler.add_job(
         func=ping_health_endpoint,
-        trigger=IntervalTrigger(minutes=1),
+        trigger=HEALTH_PING_TRIGGER,
         id='health_ping',
         name='Health Endpoint Ping',
         replace_existing=True
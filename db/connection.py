@@ -1,16 +1,24 @@
 
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
+from functools import lru_cache
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
-# Create a new client and connect to the server
-client = MongoClient(os.getenv("MONGODB"), server_api=ServerApi('1'))
+@lru_cache(maxsize=1)
+def _get_client():
+    """Create the MongoClient on first use so importing this module does no DNS/TLS work"""
+    return MongoClient(
+        os.getenv("MONGODB"),
+        server_api=ServerApi('1'),
+        maxPoolSize=20,
+        waitQueueTimeoutMS=2000
+    )
 
 # Send a ping to confirm a successful connection
 # try:
-#     client.admin.command('ping')
+#     _get_client().admin.command('ping')
 #     print("Pinged your deployment. You successfully connected to MongoDB!")
 # except Exception as e:
 #     print(e)
@@ -22,26 +30,31 @@ import uuid
 # Generate a unique ID
   # uuid4() generates a random UUID
 
-def run_query( db_name, collection_name, action, query=None, data=None):
+def run_query( db_name, collection_name, action, query=None, data=None, projection=None, sort=None, limit=0):
     """
     Execute MongoDB queries dynamically.
     
-    :param client: MongoClient instance
     :param db_name: Database name (string)
     :param collection_name: Collection name (string)
-    :param action: 'find', 'insert', 'update', 'delete'
+    :param action: 'find', 'insert', 'insert_many', 'update', 'delete'
     :param query: MongoDB query filter (dict)
-    :param data: Data for insert/update (dict)
-    :return: Query result
+    :param data: Data for insert/update (dict), or a list of dicts for insert_many
+    :param projection: Fields to return for 'find' (dict)
+    :param sort: Sort spec for 'find', e.g. [("created_at", -1)]
+    :param limit: Max documents for 'find' (0 = no limit)
+    :return: Query result ('find' returns a lazily batched cursor)
     """
    
-    db = client[db_name]
+    db = _get_client()[db_name]
     collection = db[collection_name]
 
     if action == "find":
-        return list(collection.find(query or {}))   # fetch all
+        return collection.find(query or {}, projection, sort=sort, limit=limit, batch_size=200)
     elif action == "insert":
         return collection.insert_one(data).inserted_id
+    elif action == "insert_many":
+        # Unordered so one bad document doesn't drop the rest of the batch
+        return collection.insert_many(data, ordered=False).inserted_ids
     elif action == "update":
         return collection.update_one(query, {"$set": data}).modified_count
     elif action == "delete":
@@ -55,19 +68,30 @@ def run_query( db_name, collection_name, action, query=None, data=None):
         if not query or not data:
             raise ValueError("query and data must be provided for upsert_user")
         
-        existing = collection.find_one(query)
+        # Single atomic round-trip: _id and created_at are only written on insert
+        update_data = {k: v for k, v in data.items() if k not in ("_id", "created_at")}
+        insert_only = {k: data[k] for k in ("_id", "created_at") if k in data}
         
-        if existing:
-            # User exists → update everything except _id and created_at
-            update_data = {k: v for k, v in data.items() if k not in ("_id", "created_at")}
-            result = collection.update_one(query, {"$set": update_data})
-            return existing["_id"]
-        else:
-            # User does not exist → insert full document
-            result = collection.insert_one(data)
-            return result.inserted_id
+        update = {}
+        if update_data:
+            update["$set"] = update_data
+        if insert_only:
+            update["$setOnInsert"] = insert_only
+        
+        result = collection.update_one(query, update, upsert=True)
+        if result.upserted_id is not None:
+            return result.upserted_id
+        return collection.find_one(query, {"_id": 1})["_id"]
     else:
         raise ValueError("Unsupported action")
+
+def find_all(db_name, collection_name, query=None, projection=None, sort=None, limit=0):
+    """Run a 'find' query and materialize the full result set as a list"""
+    return list(run_query(db_name, collection_name, "find", query=query, projection=projection, sort=sort, limit=limit))
+
+def ensure_index(db_name, collection_name, keys):
+    """Create an index if it doesn't exist yet (no-op on the server when it does)"""
+    return _get_client()[db_name][collection_name].create_index(keys)
     
 if __name__ == "__main__":
     # Example usage
@@ -79,4 +103,4 @@ if __name__ == "__main__":
     data = {"id": unique_id, "name": "John Doe", "age": 30}
 
     result = run_query( db_name, collection_name, action, data=data)
-    print(result)
\ No newline at end of file
+    print(list(result))
\ No newline at end of file
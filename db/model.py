@@ -18,10 +18,4 @@ class LinkedinPost(BaseModel):
     url: Optional[str] = None
     title: Optional[str] = None
     description: Optional[str] = None
-    
 
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
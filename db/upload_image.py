@@ -5,11 +5,32 @@ import os
 from supabase import create_client
 from dotenv import load_dotenv
 from pathlib import Path
-import uuid
-from datetime import datetime
+from functools import lru_cache
+import time
+import secrets
 
 load_dotenv()
 
+CONTENT_TYPE_MAP = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+DEFAULT_CONTENT_TYPE = 'image/png'
+
+@lru_cache(maxsize=1)
+def _get_supabase():
+    """Create the Supabase client once and reuse it (and its connection pool) across uploads"""
+    SUPABASE_URL = os.getenv('SUPABASE_URL')
+    SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+    
+    if not all([SUPABASE_URL, SUPABASE_KEY, os.getenv('SUPABASE_BUCKET')]):
+        raise Exception("Missing Supabase configuration. Set SUPABASE_URL, SUPABASE_KEY, and SUPABASE_BUCKET in .env")
+    
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
 def upload_image(image_path: str) -> str:
     """
     Upload an image file to Supabase storage bucket and return public URL
@@ -20,50 +41,33 @@ def upload_image(image_path: str) -> str:
     Returns:
         str: Public URL of the uploaded image
     """
-    SUPABASE_URL = os.getenv('SUPABASE_URL')
-    SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+    supabase = _get_supabase()
     SUPABASE_BUCKET = os.getenv('SUPABASE_BUCKET')
     
-    if not all([SUPABASE_URL, SUPABASE_KEY, SUPABASE_BUCKET]):
-        raise Exception("Missing Supabase configuration. Set SUPABASE_URL, SUPABASE_KEY, and SUPABASE_BUCKET in .env")
-    
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    
     # Check if file exists
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image file not found: {image_path}")
     
-    # Read image file
-    with open(image_path, 'rb') as f:
-        image_bytes = f.read()
-    
     # Generate unique filename with timestamp
-    file_ext = Path(image_path).suffix or '.png'
-    filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}{file_ext}"
-    
-    # Determine content type
-    content_type_map = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.gif': 'image/gif',
-        '.webp': 'image/webp'
-    }
-    content_type = content_type_map.get(file_ext.lower(), 'image/png')
+    file_ext = Path(image_path).suffix.lower() or '.png'
+    filename = f"{time.strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(4)}{file_ext}"
+    content_type = CONTENT_TYPE_MAP.get(file_ext, DEFAULT_CONTENT_TYPE)
     
-    # Upload to Supabase
+    # Upload to Supabase, streaming from the open file instead of loading it into memory
     try:
-        res = supabase.storage.from_(SUPABASE_BUCKET).upload(
-            filename, 
-            image_bytes, 
-            {"content-type": content_type}
-        )
+        bucket = supabase.storage.from_(SUPABASE_BUCKET)
+        with open(image_path, 'rb') as image_file:
+            res = bucket.upload(
+                filename, 
+                image_file, 
+                {"content-type": content_type}
+            )
         
         if not res:
             raise Exception("Failed to upload image to Supabase")
         
         # Get public URL
-        public_url = supabase.storage.from_(SUPABASE_BUCKET).get_public_url(filename)
+        public_url = bucket.get_public_url(filename)
         
         print(f"✅ Image uploaded successfully: {filename}")
         print(f"📸 Public URL: {public_url}")
@@ -73,6 +77,21 @@ def upload_image(image_path: str) -> str:
     except Exception as e:
         raise Exception(f"Failed to upload image to Supabase: {str(e)}")
 
+def delete_image(public_url: str):
+    """
+    Remove an image uploaded by upload_image (e.g. when the post it was for failed)
+    
+    Args:
+        public_url: Public URL returned by upload_image
+    """
+    supabase = _get_supabase()
+    filename = public_url.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+    try:
+        supabase.storage.from_(os.getenv('SUPABASE_BUCKET')).remove([filename])
+        print(f"🗑️ Image removed from Supabase: {filename}")
+    except Exception as e:
+        raise Exception(f"Failed to remove image from Supabase: {str(e)}")
+
 if __name__ == "__main__":
     # Example usage
     result = upload_image("generated_image.png")
@@ -4,10 +4,110 @@ Supports creating posts (text, URL, image/video), reacting, and commenting
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from typing import Optional, List, Dict, Any
+import os
+import re
+import hashlib
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+    _json_loads = json.loads
+
+# Accepts "urn:li:ugcPost:<id>", "urn:li:share:<id>" or a bare numeric ID
+_URN_RE = re.compile(r'^(?:urn:li:(?:ugcPost|share):)?(\d+)$')
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Hash a file without loading it into memory
+    
+    Args:
+        file_path: Path to the file
+    
+    Returns:
+        Hex SHA-256 digest of the file contents
+    """
+    with open(file_path, 'rb') as f:
+        # Streams through the buffered reader in C; OpenSSL picks SHA-NI where available
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def prefetch_file(file_path: str):
+    """
+    Ask the kernel to start reading a file into the page cache in the background,
+    so a later streamed upload does not wait on disk. No-op where unsupported.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+class _BlockReader:
+    """
+    File wrapper for streamed uploads that hands the HTTP client large blocks.
+    http.client/urllib3 ask for 8-16 KiB per read(); returning 1 MiB instead cuts the
+    Python-level read/sendall round-trips for big videos by ~64x.
+    """
+    
+    BLOCK_SIZE = 1 << 20
+    
+    def __init__(self, file, size: int):
+        self._file = file
+        self._size = size
+    
+    def __len__(self):
+        return self._size
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return self._file.read()
+        return self._file.read(max(size, self.BLOCK_SIZE))
+
+
+class LinkedInApiError(Exception):
+    """A LinkedIn API call returned an unexpected status"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LinkedInAuthError(LinkedInApiError):
+    """The access token was rejected (401/403)"""
+
+
+class LinkedInRateLimited(LinkedInApiError):
+    """LinkedIn throttled the request (429); retry_after is in seconds"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = 429, retry_after: int = 1):
+        super().__init__(message, status_code)
+        self.retry_after = retry_after
+
+
+class TokenExpiredError(LinkedInAuthError):
+    """Raised locally when the access token is known to be expired and cannot be refreshed"""
+
 
 class LinkedInBot:
     """
@@ -15,22 +115,263 @@ class LinkedInBot:
     """
     
     BASE_URL = "https://api.linkedin.com/v2"
+    TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
+    USERINFO_URL = BASE_URL + "/userinfo"
+    UGC_POSTS_URL = BASE_URL + "/ugcPosts"
+    ASSETS_REGISTER_URL = BASE_URL + "/assets?action=registerUpload"
+    LIKES_URL_TMPL = BASE_URL + "/socialActions/{}/likes"
+    REACTIONS_URL_TMPL = BASE_URL + "/socialActions/{}/reactions"
+    COMMENTS_URL_TMPL = BASE_URL + "/socialActions/{}/comments"
+    DELETE_URL_TMPL = BASE_URL + "/ugcPosts/urn%3Ali%3AugcPost%3A{}"
+    # shareMediaCategory -> label used in log and error messages
+    POST_LABELS = {
+        "NONE": "text",
+        "ARTICLE": "URL",
+        "IMAGE": "image",
+        "VIDEO": "video"
+    }
+    # Pooled connections per host; bulk() concurrency defaults to this and should not exceed it
+    MAX_CONNECTIONS = 20
+    # Concurrency for react_many/comment_many, kept within LinkedIn's ~10 requests per window
+    RATE_LIMITED_WORKERS = 10
+    # Maps a hash of the access token to its person URN so re-runs skip /userinfo
+    URN_CACHE_PATH = Path.home() / ".linkedinbot_cache.json"
     HEADERS = {
         "X-Restli-Protocol-Version": "2.0.0",
         "Content-Type": "application/json"
     }
+    VALID_REACTIONS = frozenset({"LIKE", "PRAISE", "APPRECIATION", "EMPATHY", "INTEREST", "ENTERTAINMENT"})
+    EMOJI_MAP = {
+        "LIKE": "👍",
+        "PRAISE": "🙌",
+        "APPRECIATION": "❤️",
+        "EMPATHY": "🤗",
+        "INTEREST": "💡",
+        "ENTERTAINMENT": "😂"
+    }
     
-    def __init__(self, access_token: str):
+    def __init__(
+        self,
+        access_token: str,
+        expires_at: Optional[int] = None,
+        refresh_token: Optional[str] = None,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None
+    ):
         """
         Initialize the LinkedIn Bot with an access token
         
         Args:
             access_token: OAuth 2.0 access token with w_member_social scope
+            expires_at: Optional Unix timestamp when the access token expires
+            refresh_token: Optional refresh token used to renew the access token before it expires
+            client_id: LinkedIn app client ID for refreshing (default: LINKEDIN_CLIENT_ID env var)
+            client_secret: LinkedIn app client secret for refreshing (default: LINKEDIN_CLIENT_SECRET env var)
         """
         self.access_token = access_token
+        self.expires_at = expires_at
+        self.refresh_token = refresh_token
+        self.client_id = client_id or os.getenv("LINKEDIN_CLIENT_ID")
+        self.client_secret = client_secret or os.getenv("LINKEDIN_CLIENT_SECRET")
         self.headers = self.HEADERS.copy()
         self.headers["Authorization"] = f"Bearer {access_token}"
-        self.person_urn = None
+        self._token_key = hashlib.sha256(access_token.encode()).hexdigest()[:16]
+        self.person_urn = self._load_urn_cache().get(self._token_key)
+        self._urn_lock = threading.Lock()
+        
+        # One keep-alive session so repeated calls reuse the TCP/TLS connection
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Status retries are limited to idempotent methods: replaying a POST after a 5xx
+        # could publish the same post or comment twice. 429 is left to LinkedInRateLimited
+        # (and _paced_call), Retry-After isn't slept on here so a throttled call can't stall
+        # the worker, and the last 5xx response is returned so it reaches _api_error
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'DELETE']),
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        # pool_block makes extra concurrent callers wait for a pooled socket instead of
+        # opening (and then discarding) throwaway connections with fresh TLS handshakes
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.MAX_CONNECTIONS,
+            pool_block=True,
+            max_retries=retry
+        ))
+    
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _load_urn_cache(self) -> Dict[str, str]:
+        """Read the token -> person URN cache, or an empty dict if missing/unreadable"""
+        try:
+            return _json_loads(self.URN_CACHE_PATH.read_bytes())
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_urn_cache(self):
+        """Write this token's person URN into the cache file atomically"""
+        cache = self._load_urn_cache()
+        if cache.get(self._token_key) == self.person_urn:
+            return
+        cache[self._token_key] = self.person_urn
+        try:
+            with tempfile.NamedTemporaryFile('wb', dir=self.URN_CACHE_PATH.parent, delete=False) as tmp:
+                tmp.write(_json_dumps(cache))
+            os.replace(tmp.name, self.URN_CACHE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not write person URN cache: {e}")
+    
+    def _ensure_person_urn(self):
+        """Resolve the person URN once, even when several threads need it at the same time"""
+        if self.person_urn:
+            return
+        with self._urn_lock:
+            if not self.person_urn:
+                self.get_user_info()
+    
+    def _ensure_valid_token(self):
+        """
+        Refresh the access token if it is about to expire, or fail fast without
+        spending a request round-trip if it has already expired
+        """
+        if self.expires_at is None:
+            return
+        
+        remaining = self.expires_at - time.time()
+        if remaining < 300 and self.refresh_token and self.client_id and self.client_secret:
+            self._refresh_access_token()
+        elif remaining < 60:
+            raise TokenExpiredError("LinkedIn access token has expired; obtain a new token")
+    
+    def _refresh_access_token(self):
+        """Exchange the refresh token for a new access token and update auth headers in place"""
+        # Form-encoded request, so it bypasses the JSON session
+        response = requests.post(self.TOKEN_URL, data={
+            "grant_type": "refresh_token",
+            "refresh_token": self.refresh_token,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret
+        })
+        
+        if response.status_code != 200:
+            raise TokenExpiredError(f"Failed to refresh access token: {response.status_code} - {response.text}", response.status_code)
+        
+        data = self._parse(response)
+        self.access_token = data["access_token"]
+        self.expires_at = int(time.time()) + int(data.get("expires_in", 0))
+        self.refresh_token = data.get("refresh_token", self.refresh_token)
+        self.headers["Authorization"] = f"Bearer {self.access_token}"
+        self.session.headers["Authorization"] = self.headers["Authorization"]
+        print("🔑 Access token refreshed")
+    
+    def _post(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """POST a JSON payload (Content-Type is already set on the session)"""
+        return self.session.post(url, data=_json_dumps(payload))
+    
+    @staticmethod
+    def _parse(response: requests.Response) -> Any:
+        """Decode a JSON response body"""
+        return _json_loads(response.content)
+    
+    @staticmethod
+    def _api_error(message: str, response: requests.Response) -> LinkedInApiError:
+        """Build the typed error for a failed response, keeping the 'message: status - body' format"""
+        text = f"{message}: {response.status_code} - {response.text}"
+        if response.status_code in (401, 403):
+            return LinkedInAuthError(text, response.status_code)
+        if response.status_code == 429:
+            try:
+                retry_after = int(response.headers.get('Retry-After', 1))
+            except ValueError:
+                retry_after = 1
+            return LinkedInRateLimited(text, response.status_code, retry_after)
+        return LinkedInApiError(text, response.status_code)
+    
+    def _build_share_payload(
+        self,
+        text: str,
+        category: str,
+        media: Optional[List[Dict[str, Any]]] = None,
+        visibility: str = "PUBLIC"
+    ) -> Dict[str, Any]:
+        """Build the ugcPosts body shared by all post types"""
+        share_content = {
+            "shareCommentary": {
+                "text": text
+            },
+            "shareMediaCategory": category
+        }
+        if media is not None:
+            share_content["media"] = media
+        
+        return {
+            "author": self.person_urn,
+            "lifecycleState": "PUBLISHED",
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": share_content
+            },
+            "visibility": {
+                "com.linkedin.ugc.MemberNetworkVisibility": visibility
+            }
+        }
+    
+    @staticmethod
+    def _build_media_item(title: Optional[str] = None, description: Optional[str] = None, **fields) -> Dict[str, Any]:
+        """Build one media entry (originalUrl for articles, media asset URN for uploads)"""
+        media_item = {"status": "READY", **fields}
+        if title:
+            media_item["title"] = {"text": title}
+        if description:
+            media_item["description"] = {"text": description}
+        return media_item
+    
+    def create_post(
+        self,
+        text: str,
+        category: str = "NONE",
+        media_items: Optional[List[Dict[str, Any]]] = None,
+        visibility: str = "PUBLIC",
+        label: Optional[str] = None
+    ) -> str:
+        """
+        Publish a ugcPosts share of any category
+        
+        Args:
+            text: The commentary text for the post
+            category: shareMediaCategory - NONE, ARTICLE, IMAGE or VIDEO
+            media_items: Media entries for the post (see _build_media_item)
+            visibility: Either "PUBLIC" or "CONNECTIONS" (default: PUBLIC)
+            label: Name used in messages (defaults to one derived from category)
+        
+        Returns:
+            The URN of the created post
+        """
+        self._ensure_valid_token()
+        self._ensure_person_urn()
+        
+        label = label or self.POST_LABELS.get(category, category.lower())
+        payload = self._build_share_payload(text, category, media=media_items, visibility=visibility)
+        
+        response = self._post(self.UGC_POSTS_URL, payload)
+        
+        if response.status_code == 201:
+            post_id = response.headers.get('X-RestLi-Id')
+            print(f"✅ {label[0].upper() + label[1:]} post created successfully! Post ID: {post_id}")
+            return post_id
+        else:
+            raise self._api_error(f"Failed to create {label} post", response)
     
     def get_user_info(self) -> Dict[str, Any]:
         """
@@ -39,16 +380,18 @@ class LinkedInBot:
         Returns:
             Dictionary containing user profile data including person URN
         """
-        url = f"{self.BASE_URL}/userinfo"
-        response = requests.get(url, headers=self.headers)
+        self._ensure_valid_token()
+        url = self.USERINFO_URL
+        response = self.session.get(url)
         
         if response.status_code == 200:
-            data = response.json()
+            data = self._parse(response)
             # Extract person URN from the response
             self.person_urn = f"urn:li:person:{data['sub']}"
+            self._save_urn_cache()
             return data
         else:
-            raise Exception(f"Failed to get user info: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to get user info", response)
     
     def create_text_post(self, text: str, visibility: str = "PUBLIC") -> str:
         """
@@ -61,35 +404,7 @@ class LinkedInBot:
         Returns:
             The URN of the created post
         """
-        if not self.person_urn:
-            self.get_user_info()
-        
-        url = f"{self.BASE_URL}/ugcPosts"
-        
-        payload = {
-            "author": self.person_urn,
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": text
-                    },
-                    "shareMediaCategory": "NONE"
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": visibility
-            }
-        }
-        
-        response = requests.post(url, headers=self.headers, json=payload)
-        
-        if response.status_code == 201:
-            post_id = response.headers.get('X-RestLi-Id')
-            print(f"✅ Text post created successfully! Post ID: {post_id}")
-            return post_id
-        else:
-            raise Exception(f"Failed to create text post: {response.status_code} - {response.text}")
+        return self.create_post(text, "NONE", visibility=visibility)
     
     def create_url_post(
         self, 
@@ -112,46 +427,8 @@ class LinkedInBot:
         Returns:
             The URN of the created post
         """
-        if not self.person_urn:
-            self.get_user_info()
-        
-        api_url = f"{self.BASE_URL}/ugcPosts"
-        
-        media_item = {
-            "status": "READY",
-            "originalUrl": url
-        }
-        
-        if title:
-            media_item["title"] = {"text": title}
-        if description:
-            media_item["description"] = {"text": description}
-        
-        payload = {
-            "author": self.person_urn,
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": text
-                    },
-                    "shareMediaCategory": "ARTICLE",
-                    "media": [media_item]
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": visibility
-            }
-        }
-        
-        response = requests.post(api_url, headers=self.headers, json=payload)
-        
-        if response.status_code == 201:
-            post_id = response.headers.get('X-RestLi-Id')
-            print(f"✅ URL post created successfully! Post ID: {post_id}")
-            return post_id
-        else:
-            raise Exception(f"Failed to create URL post: {response.status_code} - {response.text}")
+        media_item = self._build_media_item(title, description, originalUrl=url)
+        return self.create_post(text, "ARTICLE", [media_item], visibility=visibility)
     
     def register_image_upload(self) -> Dict[str, str]:
         """
@@ -160,10 +437,10 @@ class LinkedInBot:
         Returns:
             Dictionary containing 'uploadUrl' and 'asset' URN
         """
-        if not self.person_urn:
-            self.get_user_info()
+        self._ensure_valid_token()
+        self._ensure_person_urn()
         
-        url = f"{self.BASE_URL}/assets?action=registerUpload"
+        url = self.ASSETS_REGISTER_URL
         
         payload = {
             "registerUploadRequest": {
@@ -178,15 +455,15 @@ class LinkedInBot:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._post(url, payload)
         
         if response.status_code == 200:
-            data = response.json()
+            data = self._parse(response)
             upload_url = data['value']['uploadMechanism']['com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest']['uploadUrl']
             asset = data['value']['asset']
             return {"uploadUrl": upload_url, "asset": asset}
         else:
-            raise Exception(f"Failed to register image upload: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to register image upload", response)
     
     def register_video_upload(self) -> Dict[str, str]:
         """
@@ -195,10 +472,10 @@ class LinkedInBot:
         Returns:
             Dictionary containing 'uploadUrl' and 'asset' URN
         """
-        if not self.person_urn:
-            self.get_user_info()
+        self._ensure_valid_token()
+        self._ensure_person_urn()
         
-        url = f"{self.BASE_URL}/assets?action=registerUpload"
+        url = self.ASSETS_REGISTER_URL
         
         payload = {
             "registerUploadRequest": {
@@ -213,41 +490,49 @@ class LinkedInBot:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._post(url, payload)
         
         if response.status_code == 200:
-            data = response.json()
+            data = self._parse(response)
             upload_url = data['value']['uploadMechanism']['com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest']['uploadUrl']
             asset = data['value']['asset']
             return {"uploadUrl": upload_url, "asset": asset}
         else:
-            raise Exception(f"Failed to register video upload: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to register video upload", response)
     
-    def upload_media_file(self, file_path: str, upload_url: str) -> bool:
+    def upload_media_file(self, file_path: str, upload_url: str, checksum: bool = False) -> bool:
         """
         Upload an image or video file to LinkedIn
         
         Args:
             file_path: Path to the image or video file
             upload_url: The upload URL obtained from register_image_upload or register_video_upload
+            checksum: Also compute and log the file's SHA-256 for integrity tracing
         
         Returns:
             True if upload was successful
         """
-        with open(file_path, 'rb') as file:
-            file_data = file.read()
-        
+        self._ensure_valid_token()
+        # The upload endpoint takes raw bytes: drop the session's JSON/Rest.li headers
+        # (None removes a session header) and keep only the bearer token. An explicit
+        # Content-Length avoids chunked encoding while the body streams from disk.
+        file_size = os.path.getsize(file_path)
         upload_headers = {
-            "Authorization": f"Bearer {self.access_token}"
+            "Content-Type": None,
+            "X-Restli-Protocol-Version": None,
+            "Content-Length": str(file_size)
         }
         
-        response = requests.post(upload_url, headers=upload_headers, data=file_data)
+        with open(file_path, 'rb') as file:
+            response = self.session.post(upload_url, headers=upload_headers, data=_BlockReader(file, file_size))
         
         if response.status_code == 201:
             print(f"✅ Media file uploaded successfully!")
+            if checksum:
+                print(f"   SHA-256: {file_sha256(file_path)}")
             return True
         else:
-            raise Exception(f"Failed to upload media file: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to upload media file", response)
     
     def create_image_post(
         self,
@@ -270,6 +555,10 @@ class LinkedInBot:
         Returns:
             The URN of the created post
         """
+        self._ensure_valid_token()
+        # Warm the page cache while the registration round-trip is in flight
+        prefetch_file(image_path)
+        
         # Step 1: Register the upload
         print("📝 Registering image upload...")
         upload_info = self.register_image_upload()
@@ -280,43 +569,52 @@ class LinkedInBot:
         
         # Step 3: Create the post
         print("📮 Creating image post...")
-        url = f"{self.BASE_URL}/ugcPosts"
-        
-        media_item = {
-            "status": "READY",
-            "media": upload_info['asset']
-        }
-        
-        if title:
-            media_item["title"] = {"text": title}
-        if description:
-            media_item["description"] = {"text": description}
-        
-        payload = {
-            "author": self.person_urn,
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": text
-                    },
-                    "shareMediaCategory": "IMAGE",
-                    "media": [media_item]
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": visibility
-            }
-        }
+        media_item = self._build_media_item(title, description, media=upload_info['asset'])
+        return self.create_post(text, "IMAGE", [media_item], visibility=visibility)
+    
+    def create_multi_image_post(
+        self,
+        text: str,
+        image_paths: List[str],
+        visibility: str = "PUBLIC"
+    ) -> str:
+        """
+        Create a post with several images, registering and uploading them in parallel
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        Args:
+            text: The commentary text for the post
+            image_paths: Paths to the image files, in display order
+            visibility: Either "PUBLIC" or "CONNECTIONS" (default: PUBLIC)
         
-        if response.status_code == 201:
-            post_id = response.headers.get('X-RestLi-Id')
-            print(f"✅ Image post created successfully! Post ID: {post_id}")
-            return post_id
-        else:
-            raise Exception(f"Failed to create image post: {response.status_code} - {response.text}")
+        Returns:
+            The URN of the created post
+        """
+        self._ensure_valid_token()
+        
+        for path in image_paths:
+            prefetch_file(path)
+        
+        # Step 1: Register all uploads at once
+        print(f"📝 Registering {len(image_paths)} image uploads...")
+        upload_infos = self.bulk([self.register_image_upload for _ in image_paths])
+        for result in upload_infos:
+            if isinstance(result, Exception):
+                raise result
+        
+        # Step 2: Upload all images at once
+        print(f"📤 Uploading {len(image_paths)} images...")
+        uploads = self.bulk([
+            partial(self.upload_media_file, path, info['uploadUrl'])
+            for path, info in zip(image_paths, upload_infos)
+        ])
+        for result in uploads:
+            if isinstance(result, Exception):
+                raise result
+        
+        # Step 3: Create the post referencing every asset
+        print("📮 Creating multi-image post...")
+        media_items = [self._build_media_item(media=info['asset']) for info in upload_infos]
+        return self.create_post(text, "IMAGE", media_items, visibility=visibility, label="multi-image")
     
     def create_video_post(
         self,
@@ -339,6 +637,10 @@ class LinkedInBot:
         Returns:
             The URN of the created post
         """
+        self._ensure_valid_token()
+        # Warm the page cache while the registration round-trip is in flight
+        prefetch_file(video_path)
+        
         # Step 1: Register the upload
         print("📝 Registering video upload...")
         upload_info = self.register_video_upload()
@@ -349,43 +651,8 @@ class LinkedInBot:
         
         # Step 3: Create the post
         print("📮 Creating video post...")
-        url = f"{self.BASE_URL}/ugcPosts"
-        
-        media_item = {
-            "status": "READY",
-            "media": upload_info['asset']
-        }
-        
-        if title:
-            media_item["title"] = {"text": title}
-        if description:
-            media_item["description"] = {"text": description}
-        
-        payload = {
-            "author": self.person_urn,
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {
-                        "text": text
-                    },
-                    "shareMediaCategory": "VIDEO",
-                    "media": [media_item]
-                }
-            },
-            "visibility": {
-                "com.linkedin.ugc.MemberNetworkVisibility": visibility
-            }
-        }
-        
-        response = requests.post(url, headers=self.headers, json=payload)
-        
-        if response.status_code == 201:
-            post_id = response.headers.get('X-RestLi-Id')
-            print(f"✅ Video post created successfully! Post ID: {post_id}")
-            return post_id
-        else:
-            raise Exception(f"Failed to create video post: {response.status_code} - {response.text}")
+        media_item = self._build_media_item(title, description, media=upload_info['asset'])
+        return self.create_post(text, "VIDEO", [media_item], visibility=visibility)
     
     def like_post(self, post_urn: str) -> bool:
         """
@@ -397,22 +664,22 @@ class LinkedInBot:
         Returns:
             True if successful
         """
-        if not self.person_urn:
-            self.get_user_info()
+        self._ensure_valid_token()
+        self._ensure_person_urn()
         
-        url = f"{self.BASE_URL}/socialActions/{post_urn}/likes"
+        url = self.LIKES_URL_TMPL.format(post_urn)
         
         payload = {
             "actor": self.person_urn
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._post(url, payload)
         
         if response.status_code in [200, 201]:
             print(f"👍 Successfully liked post: {post_urn}")
             return True
         else:
-            raise Exception(f"Failed to like post: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to like post", response)
     
     def react_to_post(self, post_urn: str, reaction_type: str = "LIKE") -> bool:
         """
@@ -425,38 +692,28 @@ class LinkedInBot:
         Returns:
             True if successful
         """
-        if not self.person_urn:
-            self.get_user_info()
-        
-        # Valid reaction types
-        valid_reactions = ["LIKE", "PRAISE", "APPRECIATION", "EMPATHY", "INTEREST", "ENTERTAINMENT"]
+        self._ensure_valid_token()
+        self._ensure_person_urn()
         
-        if reaction_type.upper() not in valid_reactions:
-            raise ValueError(f"Invalid reaction type. Must be one of: {', '.join(valid_reactions)}")
+        reaction_type = reaction_type.upper()
+        if reaction_type not in self.VALID_REACTIONS:
+            raise ValueError(f"Invalid reaction type. Must be one of: {', '.join(self.EMOJI_MAP)}")
         
-        url = f"{self.BASE_URL}/socialActions/{post_urn}/reactions"
+        url = self.REACTIONS_URL_TMPL.format(post_urn)
         
         payload = {
             "actor": self.person_urn,
-            "reactionType": reaction_type.upper()
+            "reactionType": reaction_type
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._post(url, payload)
         
         if response.status_code in [200, 201]:
-            emoji_map = {
-                "LIKE": "👍",
-                "PRAISE": "🙌",
-                "APPRECIATION": "❤️",
-                "EMPATHY": "🤗",
-                "INTEREST": "💡",
-                "ENTERTAINMENT": "😂"
-            }
-            emoji = emoji_map.get(reaction_type.upper(), "👍")
+            emoji = self.EMOJI_MAP.get(reaction_type, "👍")
             print(f"{emoji} Successfully reacted to post with {reaction_type}: {post_urn}")
             return True
         else:
-            raise Exception(f"Failed to react to post: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to react to post", response)
     
     def comment_on_post(self, post_urn: str, comment_text: str) -> str:
         """
@@ -469,10 +726,10 @@ class LinkedInBot:
         Returns:
             The URN of the created comment
         """
-        if not self.person_urn:
-            self.get_user_info()
+        self._ensure_valid_token()
+        self._ensure_person_urn()
         
-        url = f"{self.BASE_URL}/socialActions/{post_urn}/comments"
+        url = self.COMMENTS_URL_TMPL.format(post_urn)
         
         payload = {
             "actor": self.person_urn,
@@ -481,7 +738,7 @@ class LinkedInBot:
             }
         }
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._post(url, payload)
         
         if response.status_code in [200, 201]:
             comment_id = response.headers.get('X-RestLi-Id', 'Unknown')
@@ -489,7 +746,7 @@ class LinkedInBot:
             print(f"   Comment ID: {comment_id}")
             return comment_id
         else:
-            raise Exception(f"Failed to comment on post: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to comment on post", response)
     
     def delete_post(self, post_urn: str) -> bool:
         """
@@ -501,24 +758,91 @@ class LinkedInBot:
         Returns:
             True if successful
         """
+        self._ensure_valid_token()
         # Extract just the ID if a full URN is provided
-        if post_urn.startswith("urn:li:ugcPost:"):
-            post_id = post_urn.replace("urn:li:ugcPost:", "")
-        elif post_urn.startswith("urn:li:share:"):
-            post_id = post_urn.replace("urn:li:share:", "")
-        else:
-            post_id = post_urn
+        match = _URN_RE.match(post_urn)
+        post_id = match.group(1) if match else post_urn
         
-        # URL encode the URN properly
-        url = f"{self.BASE_URL}/ugcPosts/urn%3Ali%3AugcPost%3A{post_id}"
+        url = self.DELETE_URL_TMPL.format(post_id)
         
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url)
         
         if response.status_code == 204:
             print(f"🗑️ Successfully deleted post: {post_urn}")
             return True
         else:
-            raise Exception(f"Failed to delete post: {response.status_code} - {response.text}")
+            raise self._api_error("Failed to delete post", response)
+    
+    def bulk(self, calls: List[Callable[[], Any]], max_workers: int = MAX_CONNECTIONS) -> List[Any]:
+        """
+        Run several API calls concurrently so their network round-trips overlap
+        
+        Args:
+            calls: Zero-argument callables, e.g. lambda: bot.react_to_post(urn, "PRAISE")
+            max_workers: Maximum number of requests in flight at once
+        
+        Returns:
+            Results in the same order as calls; a failed call yields its exception instead of raising
+        """
+        # Resolve the person URN once up front instead of once per worker
+        self._ensure_person_urn()
+        
+        def run(call):
+            try:
+                return call()
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(calls)) or 1) as pool:
+            return list(pool.map(run, calls))
+    
+    @staticmethod
+    def _paced_call(pace: float, func: Callable[..., Any], *args) -> Any:
+        """
+        Run func, then hold the worker for pace seconds so a batch stays under the rate limit.
+        A 429 is retried once after the server's Retry-After delay.
+        """
+        try:
+            return func(*args)
+        except LinkedInRateLimited as e:
+            time.sleep(e.retry_after)
+            return func(*args)
+        finally:
+            time.sleep(pace)
+    
+    def react_many(self, items: List[Tuple[str, str]], max_workers: int = RATE_LIMITED_WORKERS, pace: float = 1.0) -> List[Any]:
+        """
+        React to many posts concurrently, bounded to stay within LinkedIn's rate limit
+        
+        Args:
+            items: (post_urn, reaction_type) pairs
+            max_workers: Maximum number of requests in flight at once
+            pace: Seconds each worker waits after a request before taking the next one
+        
+        Returns:
+            Per-item result (True) or the exception it raised, in input order
+        """
+        return self.bulk(
+            [partial(self._paced_call, pace, self.react_to_post, urn, reaction) for urn, reaction in items],
+            max_workers=max_workers
+        )
+    
+    def comment_many(self, items: List[Tuple[str, str]], max_workers: int = RATE_LIMITED_WORKERS, pace: float = 1.0) -> List[Any]:
+        """
+        Comment on many posts concurrently, bounded to stay within LinkedIn's rate limit
+        
+        Args:
+            items: (post_urn, comment_text) pairs
+            max_workers: Maximum number of requests in flight at once
+            pace: Seconds each worker waits after a request before taking the next one
+        
+        Returns:
+            Per-item comment ID or the exception it raised, in input order
+        """
+        return self.bulk(
+            [partial(self._paced_call, pace, self.comment_on_post, urn, text) for urn, text in items],
+            max_workers=max_workers
+        )
     
     
 # Example usage
@@ -0,0 +1,34 @@
+"""
+JSON compat shim: orjson when available, then ujson, then the stdlib json module
+"""
+try:
+    import orjson
+
+    def dumps(obj, pretty: bool = False) -> str:
+        """Serialize to a JSON string (2-space indent when pretty)"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+
+    def dumps_bytes(obj, sort_keys: bool = False) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes, e.g. for request bodies and hashing"""
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    loads = orjson.loads
+except ImportError:
+    try:
+        import ujson as _j
+        _COMPACT = {}
+    except ImportError:
+        import json as _j
+        _COMPACT = {"separators": (",", ":")}
+
+    def dumps(obj, pretty: bool = False) -> str:
+        """Serialize to a JSON string (2-space indent when pretty)"""
+        if pretty:
+            return _j.dumps(obj, indent=2, ensure_ascii=False)
+        return _j.dumps(obj, ensure_ascii=False, **_COMPACT)
+
+    def dumps_bytes(obj, sort_keys: bool = False) -> bytes:
+        """Serialize to compact UTF-8 JSON bytes, e.g. for request bodies and hashing"""
+        return _j.dumps(obj, ensure_ascii=False, sort_keys=sort_keys, **_COMPACT).encode()
+
+    loads = _j.loads
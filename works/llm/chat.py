@@ -1,95 +1,335 @@
-import requests
-import json
-import base64
+import binascii
 import time
-from typing import Optional, List, Dict
-from works.llm.context import get_llm_context, set_llm_context, save_llm_call
+import random
+import os
+import hashlib
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, List, Dict, Callable
+from works.llm.context import append_llm_context, save_llm_call_async
+from works.llm import _json
+from works.llm import response_cache, disk_cache
+from works.llm.response_cache import make_key
 
-def chat_with_meta_llama(messages, step_name: str = "Unknown"):
+# Dump raw API responses only when LLM_DEBUG=1
+DEBUG = os.getenv("LLM_DEBUG") == "1"
+
+# DeepInfra endpoints and models
+DEEPINFRA_CHAT_URL = "https://api.deepinfra.com/v1/openai/chat/completions"
+DEEPINFRA_IMAGE_URL = "https://api.deepinfra.com/v1/openai/images/generations"
+META_MODEL = "meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8"
+NEMO_MODEL = "nvidia/Nemotron-3-Nano-30B-A3B"
+IMAGE_MODEL = "black-forest-labs/FLUX-2-pro"
+IMAGE_SIZE = "1024x1024"
+
+@lru_cache(maxsize=1)
+def _get_client():
     """
-    Send messages to Meta-Llama and get the assistant's reply.
+    Shared HTTP/2 client, created (and httpx imported) on first use so importing
+    this module stays cheap. Concurrent DeepInfra calls (chat_many) multiplex as
+    streams over one pooled TLS connection instead of opening a connection each.
+    transport retries cover failed connects only, so a POST is never replayed.
+    """
+    import httpx
+    client = httpx.Client(
+        # Generations can take well over 30s to finish, so only the connect phase is short
+        timeout=httpx.Timeout(120.0, connect=10.0),
+        transport=httpx.HTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            retries=3
+        )
+    )
+    atexit.register(client.close)
+    return client
+
+# Bodies are pre-encoded with _json.dumps_bytes rather than httpx's stdlib json= path
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Rate limits and transient server errors are retried with jittered exponential backoff
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_ATTEMPTS = 5
+MAX_BACKOFF = 30.0  # seconds
+# Pause before the next call when the provider says we're almost out of request quota
+LOW_QUOTA_PAUSE = 1.0  # seconds
+
+def _retry_delay(response, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After when the server sends it, else 2^attempt plus jitter"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF)
+        except ValueError:
+            pass  # HTTP-date form, fall back to backoff
+    return min(2 ** attempt + random.random(), MAX_BACKOFF)
+
+def _respect_quota(response):
+    """Back off preemptively when x-ratelimit-remaining-requests is nearly exhausted"""
+    remaining = response.headers.get("x-ratelimit-remaining-requests")
+    if remaining and remaining.isdigit() and int(remaining) < 2:
+        print(f"⏳ Rate limit nearly exhausted ({remaining} requests left), pausing {LOW_QUOTA_PAUSE}s")
+        time.sleep(LOW_QUOTA_PAUSE)
+
+def _post_with_retry(url: str, body: bytes, max_attempts: int = MAX_ATTEMPTS):
+    """POST an encoded JSON body, retrying 429/5xx responses; the last response is returned either way"""
+    for attempt in range(max_attempts):
+        response = _get_client().post(url, content=body, headers=JSON_HEADERS)
+        if response.status_code not in RETRY_STATUSES or attempt == max_attempts - 1:
+            _respect_quota(response)
+            return response
+        delay = _retry_delay(response, attempt)
+        print(f"⏳ DeepInfra returned {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{max_attempts})")
+        time.sleep(delay)
+
+def _lookup_cache(key: str, persist: bool = False):
+    """Check the in-process cache, then (when persist) the disk cache, promoting disk hits into memory"""
+    result = response_cache.get_cached(key)
+    if result is None and persist:
+        result = disk_cache.get_cached(key)
+        if result is not None:
+            response_cache.put_cached(key, result)
+    return result
+
+def _store_cache(key: str, result: dict, persist: bool = False):
+    """Record a successful response in memory, and on disk when persist"""
+    response_cache.put_cached(key, result)
+    if persist:
+        disk_cache.put_cached(key, result)
+
+# Context entries are joined from fixed fragments rather than formatted per call
+_CTX_TEMPLATE_PARTS = ("\nStep: ", "\nInput: ", "\nReasoning: ", "\nOutput: ", "\n---\n")
+
+def _context_entry(step_name: str, input_text: str, reasoning: str, output: str) -> str:
+    """Build one Step/Input/Reasoning/Output block for the LLM context buffer"""
+    parts = _CTX_TEMPLATE_PARTS
+    return "".join((parts[0], step_name, parts[1], input_text, parts[2], reasoning or "", parts[3], output, parts[4]))
+
+def _summarize_input(messages: list, **extra) -> str:
+    """Compact Input: echo for the context buffer: message count, last user turn (truncated) and a digest of the full history"""
+    last_user = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), None) or ""
+    if not isinstance(last_user, str):
+        last_user = _json.dumps(last_user)
+    digest = hashlib.blake2b(_json.dumps_bytes(messages), digest_size=8).hexdigest()
+    return _json.dumps({"msgs": len(messages), **extra, "last_user": last_user[:500], "digest": digest})
+
+def _stream_completion(url: str, payload: dict, stream_callback: Callable[[str], None]):
+    """
+    POST a chat completion with stream=True and consume the SSE events as they arrive,
+    passing each content delta to stream_callback.
     
-    messages: list of dicts, e.g.
-        [
-            {"role": "system", "content": "Be a helpful assistant"},
-            {"role": "user", "content": "Hi"}
-        ]
-    step_name: Name of the step calling this function
+    Returns (status_code, data, error_text), where data has the same shape as a
+    non-streamed response (choices[0].message + usage).
     """
-    url = "https://api.deepinfra.com/v1/openai/chat/completions"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "model": "meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
-        "messages": messages,
-        "stream": False,
-        "response_format": {
-        "type": "json_object"
-    }
+    content_parts = []
+    reasoning_parts = []
+    usage = None
+    body = _json.dumps_bytes(payload)
+    
+    for attempt in range(MAX_ATTEMPTS):
+        with _get_client().stream("POST", url, content=body, headers=JSON_HEADERS) as response:
+            if response.status_code != 200:
+                response.read()
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS - 1:
+                    return response.status_code, None, response.text
+                delay = _retry_delay(response, attempt)
+                print(f"⏳ DeepInfra returned {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{MAX_ATTEMPTS})")
+            else:
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    chunk = line[5:].strip()
+                    if chunk == "[DONE]":
+                        break
+                    event = _json.loads(chunk)
+                    if event.get("usage"):
+                        usage = event["usage"]
+                    for choice in event.get("choices") or []:
+                        delta = choice.get("delta") or {}
+                        if delta.get("content"):
+                            content_parts.append(delta["content"])
+                            stream_callback(delta["content"])
+                        if delta.get("reasoning_content"):
+                            reasoning_parts.append(delta["reasoning_content"])
+                _respect_quota(response)
+                break
+        time.sleep(delay)
+    
+    data = {
+        "choices": [{"message": {
+            "content": "".join(content_parts),
+            "reasoning_content": "".join(reasoning_parts)
+        }}],
+        "usage": usage
     }
+    return 200, data, None
+
+IMAGE_PATH = "generated_image.png"
+
+def _call_deepinfra(url: str, payload: dict, step_name: str, model: str,
+                    parser: Callable[[dict], tuple], input_data: dict, input_text: str,
+                    context_input: str, body: Optional[bytes] = None, cache_key: Optional[str] = None,
+                    persist_cache: bool = False, is_image: bool = False,
+                    stream_callback: Optional[Callable[[str], None]] = None):
+    """
+    Shared request flow for every DeepInfra call: cache lookup, POST (or stream),
+    parse, context entry, Mongo log.
+    
+    parser: maps the raw response to (result, reasoning, context_output); a None
+        context_output echoes the result as JSON
+    body: pre-encoded request body (defaults to payload encoded as JSON)
+    cache_key: serve and store results in the in-process cache (None disables caching)
+    persist_cache: also use the on-disk cache (shared across processes and restarts)
+    is_image: log as an image call and report errors as {"status": "error", ...}
+    stream_callback: stream the completion, passing each text chunk as it arrives
+    """
+    cached = _lookup_cache(cache_key, persist_cache) if cache_key else None
+    if cached is not None:
+        print("📦 Using cached LLM response")
+        append_llm_context(_context_entry(step_name, context_input, "cached response", _json.dumps(cached, pretty=True)))
+        save_llm_call_async(
+            step_name=step_name,
+            model=model,
+            input_data=input_data,
+            input_text=input_text,
+            output_data=cached,
+            usage=None,
+            time_taken=0,
+            is_image=is_image,
+            cache_hit=True
+        )
+        if stream_callback:
+            stream_callback(cached["data"])
+        return cached
 
     start_time = time.time()
-    response = requests.post(url, headers=headers, json=payload)
+    if stream_callback:
+        status_code, data, error_text = _stream_completion(
+            url,
+            {**payload, "stream": True, "stream_options": {"include_usage": True}},
+            stream_callback
+        )
+    else:
+        response = _post_with_retry(url, body or _json.dumps_bytes(payload))
+        status_code = response.status_code
+        data = _json.loads(response.content) if status_code == 200 else None
+        error_text = response.text if status_code != 200 else None
+        if DEBUG and data is not None and not is_image:
+            print(f"raw data ({response.http_version}): {_json.dumps(data, pretty=True)}   ")
     time_taken = time.time() - start_time
     
-    if response.status_code == 200:
-        data = response.json()
-        print(f"raw data: {json.dumps(data, indent=4   )}   ")
-        
-        # Extract assistant reply from response
+    if status_code == 200:
         try:
-            result = {
-                "data": data["choices"][0]["message"]["content"],
-                "usage": data.get("usage", None)
-            }
-            
-            # Add to context
-            reasoning = data["choices"][0]["message"].get("reasoning_content", "")
-            context_entry = f"""
-Step: {step_name}
-Input: {json.dumps(messages, indent=2)}
-Reasoning: {reasoning}
-Output: {json.dumps(result, indent=2)}
----
-"""
-            set_llm_context(get_llm_context() + context_entry)
-            
-            # Save to MongoDB
-            save_llm_call(
-                step_name=step_name,
-                model="meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
-                input_data={"messages": messages},
-                output_data=result,
-                usage=data.get("usage"),
-                time_taken=time_taken,
-                is_image=False
-            )
-            
-            return result
+            result, reasoning, context_output = parser(data)
         except (KeyError, IndexError):
             return data  # fallback: return full response if format is different
-    else:
-        error_msg = f"Error {response.status_code}: {response.text}"
-        context_entry = f"""
-Step: {step_name}
-Input: {json.dumps(messages, indent=2)}
-Reasoning: N/A
-Output: {error_msg}
----
-"""
-        set_llm_context(get_llm_context() + context_entry)
+        if cache_key:
+            _store_cache(cache_key, result, persist_cache)
+        
+        # Add to context
+        if context_output is None:
+            context_output = _json.dumps(result, pretty=True)
+        append_llm_context(_context_entry(step_name, context_input, reasoning, context_output))
         
-        # Save error to MongoDB
-        save_llm_call(
+        # Save to MongoDB (output_text is NULL for images)
+        save_llm_call_async(
             step_name=step_name,
-            model="meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
-            input_data={"messages": messages},
-            output_data={"error": error_msg},
-            usage=None,
+            model=model,
+            input_data=input_data,
+            input_text=input_text,
+            output_data=result,
+            usage=result.get("usage"),
             time_taken=time_taken,
-            is_image=False
+            is_image=is_image
         )
-        
-        return error_msg
+        return result
+
+    error_msg = f"Error {status_code}: {error_text}"
+    append_llm_context(_context_entry(
+        step_name, context_input, "Image generation failed" if is_image else "N/A", error_msg
+    ))
+    error_result = {"status": "error", "error": error_msg} if is_image else {"error": error_msg}
+    
+    # Save error to MongoDB
+    save_llm_call_async(
+        step_name=step_name,
+        model=model,
+        input_data=input_data,
+        input_text=input_text,
+        output_data=error_result,
+        usage=None,
+        time_taken=time_taken,
+        is_image=is_image
+    )
+    return error_result if is_image else error_msg
+
+def _parse_chat(data: dict):
+    """Assistant reply from a chat completion"""
+    message = data["choices"][0]["message"]
+    result = {
+        "data": message["content"],
+        "usage": data.get("usage", None)
+    }
+    return result, message.get("reasoning_content", ""), None
+
+def _parse_tool_call(data: dict):
+    """Assistant reply plus any tool calls from a chat completion"""
+    message = data["choices"][0]["message"]
+    result = {
+        "data": message.get("content", ""),
+        "tool_calls": message.get("tool_calls", []),
+        "usage": data.get("usage", None)
+    }
+    return result, message.get("reasoning_content", ""), None
+
+def _write_image(b64_image: str):
+    """Decode a base64 image and write it to IMAGE_PATH"""
+    # C decoder, no validation pass
+    image_bytes = binascii.a2b_base64(b64_image)
+    
+    # Raw fd, skipping buffered IO. Kept synchronous: step4 uploads the file as soon as
+    # chat_with_image_model returns
+    fd = os.open(IMAGE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(image_bytes)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def chat_with_meta_llama(messages, step_name: str = "Unknown", use_cache: bool = False,
+                         persist_cache: bool = False, stream_callback: Optional[Callable[[str], None]] = None):
+    """
+    Send messages to Meta-Llama and get the assistant's reply.
+    
+    messages: list of dicts, e.g.
+        [
+            {"role": "system", "content": "Be a helpful assistant"},
+            {"role": "user", "content": "Hi"}
+        ]
+    step_name: Name of the step calling this function
+    use_cache: Serve an identical earlier request from the in-process cache; only for deterministic
+        requests, since replies are sampled and a cached one is returned instead of a fresh one
+    persist_cache: Also keep the reply in the on-disk cache for 24h, across restarts (implies use_cache)
+    stream_callback: If given, the reply is streamed and each text chunk is passed to it as it arrives
+    """
+    payload = {
+        "model": META_MODEL,
+        "messages": messages,
+        "stream": False,
+        "response_format": {"type": "json_object"}
+    }
+    cache_key = make_key(META_MODEL, messages, response_format=payload["response_format"]) if use_cache or persist_cache else None
+    return _call_deepinfra(
+        DEEPINFRA_CHAT_URL, payload, step_name, META_MODEL, _parse_chat,
+        input_data={"messages": messages},
+        # Serialized once for the Mongo log; the context buffer only gets a fixed-size summary
+        input_text=_json.dumps(messages, pretty=True),
+        context_input=_summarize_input(messages),
+        cache_key=cache_key,
+        persist_cache=persist_cache,
+        stream_callback=stream_callback
+    )
 
 
 def chat_with_image_model(prompt: str, step_name: str = "Unknown"):
@@ -99,81 +339,32 @@ def chat_with_image_model(prompt: str, step_name: str = "Unknown"):
     prompt: Image generation prompt
     step_name: Name of the step calling this function
     """
-    url = "https://api.deepinfra.com/v1/openai/images/generations"
-    headers = {"Content-Type": "application/json"}
     payload = {
-            "prompt": prompt,
-            "size": "1024x1024",
-            "model": "black-forest-labs/FLUX-2-pro",
-            "n": 1
-            }
+        "prompt": prompt,
+        "size": IMAGE_SIZE,
+        "model": IMAGE_MODEL,
+        "n": 1
+    }
 
-    start_time = time.time()
-    response = requests.post(url, headers=headers, json=payload)
-    time_taken = time.time() - start_time
-    
-    if response.status_code == 200:
-        data = response.json()
-        
-        # Extract base64
-        b64_image = data["data"][0]["b64_json"]
-        
-        # Decode base64
-        image_bytes = base64.b64decode(b64_image)
-        
-        # Write to file
-        with open("generated_image.png", "wb") as f:
-            f.write(image_bytes)
-        
+    def parse_image(data: dict):
+        _write_image(data["data"][0]["b64_json"])
         print("Image saved successfully")
-        
-        # Add to context
-        context_entry = f"""
-Step: {step_name}
-Input: {json.dumps({"prompt": prompt, "model": "black-forest-labs/FLUX-2-pro", "size": "1024x1024"}, indent=2)}
-Reasoning: Image generation with prompt: {prompt}
-Output: Image generated successfully and saved to generated_image.png
----
-"""
-        set_llm_context(get_llm_context() + context_entry)
-        
-        # Save to MongoDB (output_text is NULL for images)
-        save_llm_call(
-            step_name=step_name,
-            model="black-forest-labs/FLUX-2-pro",
-            input_data={"prompt": prompt, "size": "1024x1024"},
-            output_data={"status": "success", "image_path": "generated_image.png"},
-            usage=None,
-            time_taken=time_taken,
-            is_image=True
-        )
-        
-        return {"status": "success", "image_path": "generated_image.png"}
-    else:
-        error_msg = f"Error {response.status_code}: {response.text}"
-        context_entry = f"""
-Step: {step_name}
-Input: {json.dumps({"prompt": prompt, "model": "black-forest-labs/FLUX-2-pro", "size": "1024x1024"}, indent=2)}
-Reasoning: Image generation failed
-Output: {error_msg}
----
-"""
-        set_llm_context(get_llm_context() + context_entry)
-        
-        # Save error to MongoDB
-        save_llm_call(
-            step_name=step_name,
-            model="black-forest-labs/FLUX-2-pro",
-            input_data={"prompt": prompt, "size": "1024x1024"},
-            output_data={"status": "error", "error": error_msg},
-            usage=None,
-            time_taken=time_taken,
-            is_image=True
+        return (
+            {"status": "success", "image_path": IMAGE_PATH},
+            f"Image generation with prompt: {prompt}",
+            f"Image generated successfully and saved to {IMAGE_PATH}"
         )
-        
-        return {"status": "error", "error": error_msg}
 
-def tool_caller_llm(tools: str, prompt: str, step_name: str = "Unknown"):
+    return _call_deepinfra(
+        DEEPINFRA_IMAGE_URL, payload, step_name, IMAGE_MODEL, parse_image,
+        input_data={"prompt": prompt, "size": IMAGE_SIZE},
+        input_text=None,
+        context_input=_json.dumps({"prompt": prompt, "model": IMAGE_MODEL, "size": IMAGE_SIZE}, pretty=True),
+        is_image=True
+    )
+
+def tool_caller_llm(tools, prompt: str, step_name: str = "Unknown", use_cache: bool = False,
+                    persist_cache: bool = False):
     """
     Send messages to Meta-Llama and get the assistant's reply.
     
@@ -182,99 +373,58 @@ def tool_caller_llm(tools: str, prompt: str, step_name: str = "Unknown"):
             {"role": "system", "content": "Be a helpful assistant"},
             {"role": "user", "content": "Hi"}
         ]
+    tools: tool schema list, or its pre-serialized JSON bytes (e.g. tools.NEWS_TOOLS_JSON)
     step_name: Name of the step calling this function
+    use_cache: Serve an identical earlier request from the in-process cache (deterministic requests only)
+    persist_cache: Also keep the reply in the on-disk cache for 24h (implies use_cache)
     """
     messages = [
         {"role": "system", "content": "You are a helpful assistant that can call tools to perform actions. concisely"},
         {"role": "user", "content": f" {prompt}"}
     ]
-    url = "https://api.deepinfra.com/v1/openai/chat/completions"
-    headers = {"Content-Type": "application/json"}
     payload = {
-        "model": "nvidia/Nemotron-3-Nano-30B-A3B",
+        "model": NEMO_MODEL,
         "messages": messages,
         "stream": False,
-        "tools": tools,
         "tool_choice": "auto"
     }
+    # Splice the (usually pre-serialized) tool schemas into the encoded body as-is
+    tools_json = tools if isinstance(tools, bytes) else _json.dumps_bytes(tools)
+    body = _json.dumps_bytes(payload)[:-1] + b',"tools":' + tools_json + b'}'
+    # Format input for context (include prompt and tools summary), serialized once
+    tools_summary = f"{len(tools)} tools available" if isinstance(tools, list) else "tools provided"
+    input_data = {
+        "prompt": prompt,
+        "messages": messages,
+        "tools": tools_summary
+    }
+    cache_key = make_key(NEMO_MODEL, messages, tools=hashlib.sha256(tools_json).hexdigest()) if use_cache or persist_cache else None
+    return _call_deepinfra(
+        DEEPINFRA_CHAT_URL, payload, step_name, NEMO_MODEL, _parse_tool_call,
+        input_data=input_data,
+        input_text=_json.dumps(input_data, pretty=True),
+        # Keep "prompt" in the summary: refine_post_check reads the Step 1 topic from it
+        context_input=_summarize_input(messages, prompt=prompt[:500], tools=tools_summary),
+        body=body,
+        cache_key=cache_key,
+        persist_cache=persist_cache
+    )
 
-    start_time = time.time()
-    response = requests.post(url, headers=headers, json=payload)
-    time_taken = time.time() - start_time
+
+def chat_many(messages_list: List[list], step_name: str = "Unknown", max_workers: int = 8) -> list:
+    """
+    Run several independent chat_with_meta_llama calls concurrently.
     
-    if response.status_code == 200:
-        data = response.json()
-        print(f"raw data: {json.dumps(data, indent=4   )}   ")
-        # Extract assistant reply from response
-        try:
-            message = data["choices"][0]["message"]
-            result = {
-                "data": message.get("content", ""),
-                "tool_calls": message.get("tool_calls", []),
-                "usage": data.get("usage", None)
-            }
-            
-            # Add to context
-            reasoning = message.get("reasoning_content", "")
-            # Format input for context (include prompt and tools summary)
-            tools_summary = f"{len(tools)} tools available" if isinstance(tools, list) else "tools provided"
-            input_data = {
-                "prompt": prompt,
-                "messages": messages,
-                "tools": tools_summary
-            }
-            context_entry = f"""
-Step: {step_name}
-Input: {json.dumps(input_data, indent=2)}
-Reasoning: {reasoning}
-Output: {json.dumps(result, indent=2)}
----
-"""
-            set_llm_context(get_llm_context() + context_entry)
-            
-            # Save to MongoDB
-            save_llm_call(
-                step_name=step_name,
-                model="nvidia/Nemotron-3-Nano-30B-A3B",
-                input_data=input_data,
-                output_data=result,
-                usage=data.get("usage"),
-                time_taken=time_taken,
-                is_image=False
-            )
-            
-            return result
-        except (KeyError, IndexError):
-            return data  # fallback: return full response if format is different
-    else:
-        error_msg = f"Error {response.status_code}: {response.text}"
-        tools_summary = f"{len(tools)} tools available" if isinstance(tools, list) else "tools provided"
-        input_data = {
-            "prompt": prompt,
-            "messages": messages,
-            "tools": tools_summary
-        }
-        context_entry = f"""
-Step: {step_name}
-Input: {json.dumps(input_data, indent=2)}
-Reasoning: N/A
-Output: {error_msg}
----
-"""
-        set_llm_context(get_llm_context() + context_entry)
-        
-        # Save error to MongoDB
-        save_llm_call(
-            step_name=step_name,
-            model="nvidia/Nemotron-3-Nano-30B-A3B",
-            input_data=input_data,
-            output_data={"error": error_msg},
-            usage=None,
-            time_taken=time_taken,
-            is_image=False
-        )
-        
-        return error_msg
+    messages_list: one messages list per request
+    step_name: Name of the step calling this function
+    max_workers: maximum number of requests in flight
+    
+    Returns the replies in the same order as messages_list.
+    """
+    if not messages_list:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(messages_list))) as pool:
+        return list(pool.map(lambda messages: chat_with_meta_llama(messages, step_name=step_name), messages_list))
 
 
 if __name__ == "__main__":
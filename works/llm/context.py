@@ -1,30 +1,49 @@
 """
 LLM Context Management
 """
-import sys
-import os
 import time
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
 from db.connection import run_query
-import json
+from works.llm import _json
 
-llm_context = ""
+# Entries are buffered and only joined on read, so appends stay O(1);
+# the joined string is memoized until the next write
+llm_context_chunks: list = []
+_joined_cache = None
+_context_lock = threading.Lock()
 
 def set_llm_context(context: str):
-    global llm_context
-    llm_context = context
+    """Replace the whole context (set_llm_context("") resets it)"""
+    global _joined_cache
+    with _context_lock:
+        llm_context_chunks[:] = [context] if context else []
+        _joined_cache = None
+
+def append_llm_context(entry: str):
+    """Append to the context atomically (safe when several LLM calls run concurrently)"""
+    global _joined_cache
+    with _context_lock:
+        llm_context_chunks.append(entry)
+        _joined_cache = None
 
 def get_llm_context():
-    global llm_context
-    return llm_context
+    global _joined_cache
+    with _context_lock:
+        if _joined_cache is None:
+            _joined_cache = "".join(llm_context_chunks)
+        return _joined_cache
 
 def save_llm_call(step_name: str, model: str, input_data: dict, output_data: dict = None, 
-                  usage: dict = None, time_taken: float = None, is_image: bool = False):
-    """Save LLM call to MongoDB"""
+                  usage: dict = None, time_taken: float = None, is_image: bool = False,
+                  cache_hit: bool = False, input_text: str = None):
+    """Queue an LLM call for a batched MongoDB insert (pass input_text when the input is already serialized)"""
     try:
-        input_text = json.dumps(input_data, indent=2) if input_data else None
-        output_text = None if is_image else (json.dumps(output_data, indent=2) if output_data else None)
+        if input_text is None:
+            input_text = _json.dumps(input_data) if input_data else None
+        output_text = None if is_image else (_json.dumps(output_data) if output_data else None)
         
         call_data = {
             "step_name": step_name,
@@ -36,9 +55,79 @@ def save_llm_call(step_name: str, model: str, input_data: dict, output_data: dic
             "time_taken": time_taken,
             "input_text": input_text,
             "output_text": output_text,
+            "cache_hit": cache_hit,
             "created_at": datetime.now()
         }
         
-        run_query("student", "llm_calls", "insert", data=call_data)
+        _queue_call(call_data)
     except Exception as e:
         print(f"⚠️ Failed to save LLM call to DB: {e}")
+
+# Call documents are buffered and written with one insert_many per batch,
+# flushed when LOG_BATCH_SIZE is reached or LOG_FLUSH_INTERVAL after the first queued call
+LOG_BATCH_SIZE = 20
+LOG_FLUSH_INTERVAL = 2.0  # seconds
+_pending_calls: list = []
+_pending_lock = threading.Lock()
+_flush_timer = None
+
+def _flush_pending():
+    """Write all buffered call documents to Mongo in a single insert_many"""
+    global _flush_timer
+    with _pending_lock:
+        batch = _pending_calls[:]
+        _pending_calls.clear()
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    if not batch:
+        return
+    try:
+        run_query("student", "llm_calls", "insert_many", data=batch)
+    except Exception as e:
+        print(f"⚠️ Failed to save {len(batch)} LLM calls to DB: {e}")
+
+def _queue_call(call_data: dict):
+    """Buffer one call document, flushing right away once the batch is full"""
+    global _flush_timer
+    with _pending_lock:
+        _pending_calls.append(call_data)
+        full = len(_pending_calls) >= LOG_BATCH_SIZE
+        if not full and _flush_timer is None:
+            _flush_timer = threading.Timer(LOG_FLUSH_INTERVAL, _flush_pending)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    if full:
+        _flush_pending()
+
+# Registered before the executor shutdown: atexit runs handlers in reverse, so
+# queued save_llm_call_async jobs finish first and this final flush catches them
+atexit.register(_flush_pending)
+
+# Mongo logging runs off the request path; pending writes are flushed at exit
+_LOG_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llmlog")
+atexit.register(_LOG_EXECUTOR.shutdown, wait=True)
+
+# save_llm_call_async jobs still running, so flush_llm_calls can wait for them
+_log_futures = set()
+
+def _forget_log_future(future):
+    with _pending_lock:
+        _log_futures.discard(future)
+
+def save_llm_call_async(**kwargs):
+    """Queue save_llm_call on a background thread so callers don't wait on the insert"""
+    future = _LOG_EXECUTOR.submit(save_llm_call, **kwargs)
+    with _pending_lock:
+        _log_futures.add(future)
+    future.add_done_callback(_forget_log_future)
+
+def flush_llm_calls(timeout: float = 10.0):
+    """
+    Wait for queued LLM call logs and write the pending batch now. Call at the end of a run:
+    process pool workers exit via os._exit, so the atexit flush never runs there
+    """
+    with _pending_lock:
+        futures = list(_log_futures)
+    wait(futures, timeout=timeout)
+    _flush_pending()
@@ -0,0 +1,29 @@
+"""
+On-disk cache for LLM responses, shared across processes and restarts
+"""
+import os
+from functools import lru_cache
+import diskcache
+
+CACHE_DIR = os.getenv("LLM_CACHE_DIR", "/tmp/llm_cache")
+DEFAULT_EXPIRE = 86400  # seconds
+
+@lru_cache(maxsize=1)
+def _get_cache():
+    """Open the cache directory once per process"""
+    return diskcache.Cache(CACHE_DIR)
+
+def get_cached(key: str):
+    """Return the stored result for key, or None (cache errors count as a miss)"""
+    try:
+        return _get_cache().get(key)
+    except Exception as e:
+        print(f"⚠️ LLM disk cache read failed: {e}")
+        return None
+
+def put_cached(key: str, result: dict, expire: int = DEFAULT_EXPIRE):
+    """Store result under key for expire seconds"""
+    try:
+        _get_cache().set(key, result, expire=expire)
+    except Exception as e:
+        print(f"⚠️ LLM disk cache write failed: {e}")
@@ -0,0 +1,46 @@
+"""
+In-process LRU cache for LLM responses
+"""
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from works.llm import _json
+
+MAX_ENTRIES = 10000
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def _normalize(value):
+    """Collapse runs of whitespace in every string so formatting-only differences share a key"""
+    if isinstance(value, str):
+        return _WHITESPACE_RE.sub(' ', value).strip()
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+def make_key(model: str, messages, **params) -> str:
+    """Key a request by model, normalized messages and any extra payload params (tools, response_format)"""
+    blob = _json.dumps_bytes([model, _normalize(messages), params], sort_keys=True)
+    return hashlib.sha256(blob).hexdigest()
+
+def get_cached(key: str):
+    """Return a copy of the cached result, or None"""
+    with _lock:
+        result = _cache.get(key)
+        if result is None:
+            return None
+        _cache.move_to_end(key)
+        return dict(result)
+
+def put_cached(key: str, result: dict):
+    """Store a result, evicting the least recently used entry past MAX_ENTRIES"""
+    with _lock:
+        _cache[key] = dict(result)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
@@ -1,3 +1,5 @@
+from works.llm import _json
+
 # LinkedIn API tools
 linkedin_tools = [
     {
@@ -370,4 +372,9 @@ image_generation_tools = [
             }
         }
     }
-]
\ No newline at end of file
+]
+
+# Serialized once at import; pass these to tool_caller_llm to skip re-encoding the schemas per call
+LINKEDIN_TOOLS_JSON = _json.dumps_bytes(linkedin_tools)
+NEWS_TOOLS_JSON = _json.dumps_bytes(news_tools)
+IMAGE_GEN_TOOLS_JSON = _json.dumps_bytes(image_generation_tools)
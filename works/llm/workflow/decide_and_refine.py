@@ -0,0 +1,74 @@
+"""
+Step 3 + 3.5 fused: decide the post type and refine the decision in a single LLM call
+"""
+import logging
+from works.llm.chat import chat_with_meta_llama
+from works.llm.workflow.step3 import build_decision_messages, parse_json_reply, fallback_decision, DECISION_FORMAT
+from works.llm.workflow.refine_post_check import extract_key_context
+from works.llm import _json
+
+logger = logging.getLogger(__name__)
+
+def build_fused_spec(context_summary: str) -> str:
+    """Response instructions asking for the initial decision and its refined version together"""
+    return f"""Workflow Journey & Context:
+{context_summary}
+
+Do two things in one answer:
+1. "initial": decide the post, following the guidelines above
+2. "refined": refine and enhance that decision into the best possible version:
+- For image_post: Create a highly detailed, vivid image_prompt that will generate an engaging visual
+- Make the post text substantial, descriptive, and engaging (at least 3-4 sentences, not short)
+- Ensure title and description are compelling and informative
+- Keep the same post_type unless there's a strong reason to change
+- Make URLs in text more natural if included
+
+Return JSON in this exact format, where both "initial" and "refined" follow this shape:
+{DECISION_FORMAT}
+
+{{
+    "initial": {{ ...decision... }},
+    "refined": {{ ...enhanced decision... }}
+}}"""
+
+def decide_and_refine(news_content: dict, existing_posts: list):
+    """
+    Decide the post type and refine it with one chat request instead of two
+
+    Args:
+        news_content: News content from step1
+        existing_posts: Recent posts from step2
+
+    Returns:
+        dict: Refined decision (falls back to the initial decision, then to a news-based default)
+    """
+    messages = build_decision_messages(
+        news_content, existing_posts, response_spec=build_fused_spec(extract_key_context())
+    )
+    reply = chat_with_meta_llama(messages, step_name="Step 3: Decide and Refine Post")
+
+    try:
+        result = parse_json_reply(reply)
+    except Exception as e:
+        logger.warning("⚠️ Error deciding post: %s, using fallback decision", e)
+        return fallback_decision(news_content)
+
+    refined = result.get("refined")
+    if isinstance(refined, dict) and refined.get("post_type"):
+        logger.info("✅ Enhanced decision: %s post", refined.get('post_type'))
+        return refined
+
+    initial = result.get("initial")
+    if isinstance(initial, dict) and initial.get("post_type"):
+        logger.warning("⚠️ No refined decision in response, using initial decision")
+        return initial
+
+    # The model ignored the wrapper and answered with a single decision
+    if result.get("post_type"):
+        return result
+    return fallback_decision(news_content)
+
+if __name__ == "__main__":
+    news = {"all_items": [{"title": "Test", "summary": "Test summary", "url": "https://example.com"}], "image_urls": []}
+    decision = decide_and_refine(news, [])
+    print(_json.dumps(decision, pretty=True))
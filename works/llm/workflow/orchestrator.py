@@ -1,34 +1,43 @@
 """
 Workflow Orchestrator: Runs all steps in sequence
 """
-import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 
-from works.llm.workflow.step1 import gather_news_content
-from works.llm.context import get_llm_context, set_llm_context
-from works.llm.workflow.step2 import get_existing_posts
-from works.llm.workflow.step3 import decide_post_type
-from works.llm.workflow.refine_post_check import refine_post_decision
-from works.llm.workflow.step4 import create_post
-from works.llm.workflow.step5 import save_post_to_db
-from works.news_current_affairs import get_trending_topics
-from main import LinkedInBot
-import os
 from dotenv import load_dotenv
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
+# The step modules (and LinkedInBot) are imported inside run_workflow, so importing
+# this module (e.g. from app.py in the Flask process) stays cheap
+
+@lru_cache(maxsize=4)
+def _get_bot(access_token: str, expires_at: int = None, refresh_token: str = None):
+    """
+    Reuse one LinkedInBot (HTTP session, cached person URN) per token across runs in this process.
+    Safe to share: the bot only holds auth and connection state, and refreshes its own token.
+    """
+    from main import LinkedInBot
+    return LinkedInBot(access_token, expires_at=expires_at, refresh_token=refresh_token)
+
 def run_workflow(topic: str, access_token: str = None):
     """
     Run complete workflow:
     1. Gather news content
     2. Get existing posts
-    3. Decide post type
+    3. Decide post type and refine it (one LLM call)
     4. Create post
     5. Save to database
     """
+    from works.llm.workflow.step1 import gather_news_content
+    from works.llm.context import get_llm_context, set_llm_context, flush_llm_calls
+    from works.llm.workflow.step2 import get_existing_posts
+    from works.llm.workflow.decide_and_refine import decide_and_refine
+    from works.llm.workflow.step4 import create_post
+    from works.llm.workflow.step5 import save_post_to_db
+    
     if not access_token:
         access_token = os.getenv("LINKEDIN_ACCESS_TOKEN", "")
     
@@ -39,68 +48,81 @@ def run_workflow(topic: str, access_token: str = None):
     # Reset context at start
     set_llm_context("")
     
-    bot = LinkedInBot(access_token)
-    
-    print("=" * 60)
-    print("🚀 Starting LinkedIn Post Workflow")
-    print("=" * 60)
-    
-    # Step 1: Gather news content
-    print("\n📰 STEP 1: Gathering news content...")
-    news_content = gather_news_content(topic)
-    
-    # Step 2: Get existing posts
-    print("\n📋 STEP 2: Fetching existing posts...")
-    existing_posts = get_existing_posts(limit=10)
-    
-    # Step 3: Decide post type
-    print("\n🤔 STEP 3: LLM deciding post type...")
-    decision = decide_post_type(news_content, existing_posts)
-    
-    # Step 3.5: Refine and enhance decision
-    print("\n✨ STEP 3.5: Refining and enhancing post decision...")
-    decision = refine_post_decision(decision, news_content)
-    
-    # Step 4: Create post
-    print("\n📮 STEP 4: Creating LinkedIn post...")
-    post_urn = create_post(bot, decision)
-    
-    if not post_urn:
-        print("❌ Failed to create post")
-        return None
-    
-    # Step 5: Save to database
-    print("\n💾 STEP 5: Saving post to database...")
-    save_post_to_db(bot, post_urn, decision, news_content)
-    
-    print("\n" + "=" * 60)
-    print("✅ Workflow completed successfully!")
-    print(f"📝 Post URN: {post_urn}")
-    print("=" * 60)
-    
-    # Save context to file
-    context = get_llm_context()
-    # if context:
-    #     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    #     filename = f"llm_context_{timestamp}.txt"
-    #     with open(filename, "w", encoding="utf-8") as f:
-    #         f.write(f"LinkedIn Bot LLM Context - {datetime.now().isoformat()}\n")
-    #         f.write("=" * 60 + "\n\n")
-    #         f.write(context)
-    #     print(f"📄 Context saved to: {filename}")
+    expires_at = os.getenv("LINKEDIN_TOKEN_EXPIRES_AT")
+    bot = _get_bot(
+        access_token,
+        expires_at=int(expires_at) if expires_at else None,
+        refresh_token=os.getenv("LINKEDIN_REFRESH_TOKEN")
+    )
     
-    return {
-        "post_urn": post_urn,
-        "decision": decision,
-        "news_content": news_content
-    }
+    try:
+        print("=" * 60)
+        print("🚀 Starting LinkedIn Post Workflow")
+        print("=" * 60)
+        
+        # Step 2 doesn't depend on step 1, so the DB read runs behind the news gathering
+        # (MongoClient is thread-safe)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            print("\n📋 STEP 2: Fetching existing posts (in background)...")
+            posts_future = pool.submit(get_existing_posts, limit=10)
+            
+            # Step 1: Gather news content
+            print("\n📰 STEP 1: Gathering news content...")
+            news_content = gather_news_content(topic)
+            
+            existing_posts = posts_future.result()
+        
+        # Step 3: Decide post type and refine it in one request
+        print("\n🤔 STEP 3: LLM deciding and refining post...")
+        decision = decide_and_refine(news_content, existing_posts)
+        
+        # Step 4: Create post
+        print("\n📮 STEP 4: Creating LinkedIn post...")
+        post_urn = create_post(bot, decision)
+        
+        if not post_urn:
+            print("❌ Failed to create post")
+            return None
+        
+        # Step 5: Save to database
+        print("\n💾 STEP 5: Saving post to database...")
+        save_post_to_db(bot, post_urn, decision, news_content)
+        
+        print("\n" + "=" * 60)
+        print("✅ Workflow completed successfully!")
+        print(f"📝 Post URN: {post_urn}")
+        print("=" * 60)
+        
+        # Save context to file
+        context = get_llm_context()
+        # if context:
+        #     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        #     filename = f"llm_context_{timestamp}.txt"
+        #     with open(filename, "w", encoding="utf-8") as f:
+        #         f.write(f"LinkedIn Bot LLM Context - {datetime.now().isoformat()}\n")
+        #         f.write("=" * 60 + "\n\n")
+        #         f.write(context)
+        #     print(f"📄 Context saved to: {filename}")
+        
+        return {
+            "post_urn": post_urn,
+            "decision": decision,
+            "news_content": news_content
+        }
+    finally:
+        # Write this run's LLM call logs now; the atexit flush doesn't run in pool workers
+        flush_llm_calls()
 
 if __name__ == "__main__":
     # Example usage
-    import json
+    import logging
+    from works.llm import _json
+    from works.news_current_affairs import get_trending_topics
+    # Same format as app.py, which configures logging when the workflow runs under the scheduler
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(message)s', level=logging.INFO)
     print("Starting workflow...")
     topics = get_trending_topics()
-    print(f"Trending topics: {json.dumps(topics, indent=2) if topics else 'No topics found'}")
+    print(f"Trending topics: {_json.dumps(topics, pretty=True) if topics else 'No topics found'}")
     result = run_workflow(topics)
     if result:
         print(f"\n✅ Created post: {result['post_urn']}")
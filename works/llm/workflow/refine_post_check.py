@@ -2,43 +2,83 @@
 Step 3.5: Refine and enhance the post decision before execution
 Takes decision from step3 and enhances it (better prompts, more descriptive text)
 """
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
-
+import logging
 from works.llm.chat import chat_with_meta_llama
 from works.llm.context import get_llm_context
-import json
+from works.llm.workflow.step3 import extract_first_json
+from works.llm import _json
 import re
+from functools import lru_cache
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+# Context entries end with this separator (see chat._CTX_TEMPLATE_PARTS)
+_SECTION_SEP = '\n---\n'
+
+# Context extraction patterns, compiled once and run against single sections only
+_TOOL_CALL_RE = re.compile(r'"name":\s*"([^"]+)".*?"arguments":\s*"([^"]+)"')
+_DECISION_OUTPUT_RE = re.compile(r'Output:.*?({[^}]*"post_type"[^}]*})', re.DOTALL)
+_POST_TYPE_RE = re.compile(r'"post_type":\s*"([^"]+)"')
+_INPUT_PROMPT_RE = re.compile(r'Input:.*?"prompt":\s*"([^"]{0,300})', re.DOTALL)
+_TOPIC_RE = re.compile(r'about:\s*([^\n]{0,200})')
+
+# Longer string fields are cut before they go into the refine prompt (fewer prompt tokens)
+MAX_FIELD_CHARS = 1500
+
+def _trim(value, limit: int):
+    """Truncate strings longer than limit, marking the cut with an ellipsis"""
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + "…"
+    return value
 
 def extract_key_context():
     """Extract important context: step outputs, news items, and journey"""
     context = get_llm_context()
     if not context:
         return "No previous context available."
-    
+    return _summarize_context(context)
+
+# Keyed by the context string itself, so an appended or reset context is simply a new entry
+@lru_cache(maxsize=4)
+def _summarize_context(context: str) -> str:
+    """Scan a non-empty context string for the parts extract_key_context reports"""
     key_parts = []
     
+    # One pass over the entries: keep the last Step 1 section (and its prompt)
+    # and the first Step 3 decision section
+    step1_section = None
+    step1_prompt = None
+    step3_section = None
+    for section in context.split(_SECTION_SEP):
+        section = section.lstrip('\n')
+        if section.startswith('Step: Step 1'):
+            if section.startswith('Step: Step 1: Gather News') and 'Output:' in section:
+                step1_section = section
+            prompt_match = _INPUT_PROMPT_RE.search(section)
+            if prompt_match:
+                step1_prompt = prompt_match.group(1)
+        elif step3_section is None and section.startswith('Step: Step 3: Decide Post Type'):
+            step3_section = _DECISION_OUTPUT_RE.search(section)
+    
     # Step 1: Extract news items gathered
-    step1_sections = re.findall(r'Step: Step 1: Gather News.*?Output:.*?---', context, re.DOTALL)
-    if step1_sections:
+    if step1_section:
         # Extract tool calls to see what news was gathered
-        tool_calls = re.findall(r'"name":\s*"([^"]+)".*?"arguments":\s*"([^"]+)"', step1_sections[-1])
+        tool_calls = _TOOL_CALL_RE.findall(step1_section)
         if tool_calls:
             key_parts.append("Step 1 - News Gathering:")
-            for tool_name, args in tool_calls[:3]:  # Show first 3 tool calls
+            for tool_name, args in islice(tool_calls, 3):  # Show first 3 tool calls
                 try:
-                    args_dict = json.loads(args.replace('\\"', '"'))
+                    args_dict = _json.loads(args.replace('\\"', '"'))
                     if 'topic' in args_dict:
                         key_parts.append(f"  - {tool_name}: {args_dict.get('topic', 'N/A')}")
                 except:
                     key_parts.append(f"  - {tool_name}: called")
     
     # Step 3: Extract full decision output
-    step3_section = re.search(r'Step: Step 3: Decide Post Type.*?Output:.*?({[^}]*"post_type"[^}]*})', context, re.DOTALL)
     if step3_section:
         try:
-            decision_json = json.loads(step3_section.group(1))
+            decision_json = _json.loads(step3_section.group(1))
             key_parts.append("\nStep 3 - Decision:")
             key_parts.append(f"  Post Type: {decision_json.get('post_type', 'N/A')}")
             if decision_json.get('text'):
@@ -49,18 +89,17 @@ def extract_key_context():
                 key_parts.append(f"  Image Prompt: {prompt_preview}")
         except:
             # Fallback: extract post_type
-            post_type_match = re.search(r'"post_type":\s*"([^"]+)"', step3_section.group(0))
+            post_type_match = _POST_TYPE_RE.search(step3_section.group(0))
             if post_type_match:
                 key_parts.append(f"\nStep 3 - Decision: {post_type_match.group(1)} post")
     
     # Extract news items from Step 1 input (what topics/news were researched)
-    step1_inputs = re.findall(r'Step: Step 1[^\n]*\n.*?Input:.*?"prompt":\s*"([^"]{0,300})', context, re.DOTALL)
-    if step1_inputs:
+    if step1_prompt:
         # Extract topic/news info from prompt
-        prompt = step1_inputs[-1]
+        prompt = step1_prompt
         if 'Research and gather' in prompt:
             # Try to extract topic
-            topic_match = re.search(r'about:\s*([^\n]{0,200})', prompt)
+            topic_match = _TOPIC_RE.search(prompt)
             if topic_match:
                 topic_info = topic_match.group(1).replace('\\n', ' ')[:200]
                 key_parts.append(f"\nNews Topics Researched: {topic_info}...")
@@ -80,14 +119,20 @@ def refine_post_decision(decision: dict, news_content: dict = None):
     """
     context_summary = extract_key_context()
     
+    # Rendered once, with long fields trimmed
+    decision_json = _json.dumps({k: _trim(v, MAX_FIELD_CHARS) for k, v in decision.items()}, pretty=True)
+    
     # Add news items summary if available
     news_summary = ""
     if news_content and news_content.get('all_items'):
-        news_summary = f"\n\nNews Items Gathered ({len(news_content['all_items'])} items):\n"
-        for i, item in enumerate(news_content['all_items'][:5], 1):
-            news_summary += f"{i}. {item.get('title', 'N/A')[:80]}...\n"
-        if len(news_content['all_items']) > 5:
-            news_summary += f"... and {len(news_content['all_items']) - 5} more items\n"
+        items = news_content['all_items']
+        news_parts = [f"\n\nNews Items Gathered ({len(items)} items):\n"]
+        news_parts.extend(
+            f"{i}. {item.get('title', 'N/A')[:80]}...\n" for i, item in enumerate(islice(items, 5), 1)
+        )
+        if len(items) > 5:
+            news_parts.append(f"... and {len(items) - 5} more items\n")
+        news_summary = "".join(news_parts)
     
     # Build enhancement prompt
     messages = [
@@ -103,7 +148,7 @@ Workflow Journey & Context:
 {context_summary}{news_summary}
 
 Current Decision to Enhance:
-{json.dumps(decision, indent=2)}
+{decision_json}
 
 Enhancement Guidelines:
 - For image_post: Create a highly detailed, vivid image_prompt that will generate an engaging visual
@@ -138,23 +183,8 @@ Return enhanced JSON in this exact format:
                     response_data = reply["choices"][0].get("message", {}).get("content", "")
             
             if response_data:
-                response_str = str(response_data).strip()
-                
-                # Remove markdown code blocks
-                if "```json" in response_str:
-                    response_str = re.sub(r'```json\s*', '', response_str)
-                    response_str = re.sub(r'```\s*$', '', response_str)
-                elif "```" in response_str:
-                    response_str = re.sub(r'```\s*', '', response_str)
-                    response_str = re.sub(r'```\s*$', '', response_str)
-                
-                # Extract JSON
-                json_match = re.search(r'\{.*"post_type".*\}', response_str, re.DOTALL)
-                if json_match:
-                    response_str = json_match.group(0)
-                
-                enhanced_decision = json.loads(response_str)
-                print(f"✅ Enhanced decision: {enhanced_decision.get('post_type')} post")
+                enhanced_decision = extract_first_json(str(response_data))
+                logger.info("✅ Enhanced decision: %s post", enhanced_decision.get('post_type'))
                 return enhanced_decision
             else:
                 raise ValueError("No data in response")
@@ -162,7 +192,7 @@ Return enhanced JSON in this exact format:
             raise ValueError(f"Unexpected reply type: {type(reply)}")
             
     except Exception as e:
-        print(f"⚠️ Error refining decision: {e}, using original decision")
+        logger.warning("⚠️ Error refining decision: %s, using original decision", e)
         return decision  # Fallback to original
 
 if __name__ == "__main__":
@@ -175,4 +205,4 @@ if __name__ == "__main__":
         "visibility": "PUBLIC"
     }
     enhanced = refine_post_decision(test_decision)
-    print(json.dumps(enhanced, indent=2))
+    print(_json.dumps(enhanced, pretty=True))
@@ -2,21 +2,26 @@
 Step 1: Gather news content on a topic using news tools
 LLM calls news tools repeatedly until satisfied with content
 """
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
-
+import logging
 from works.llm.chat import tool_caller_llm
-from works.llm.tools import news_tools
-from works.news_current_affairs import fetch_reddit, fetch_gnews, dig_deeper_topic, get_world_snapshot
-from works.llm.context import get_llm_context, set_llm_context
-import json
+from works.llm.tools import NEWS_TOOLS_JSON
+from works.news_current_affairs import fetch_reddit, fetch_gnews_cached, dig_deeper_topic, get_world_snapshot
+from works.llm import _json
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on news fetches in flight for one batch of tool calls
+MAX_TOOL_WORKERS = 8
+# Unique news items kept for the later steps, and the count that ends gathering early
+MAX_ITEMS = 20
+MIN_ITEMS = 5
 
 def execute_news_tool(tool_name: str, **kwargs):
     """Execute news tool functions"""
     tool_map = {
         "fetch_reddit": fetch_reddit,
-        "fetch_gnews": fetch_gnews,
+        "fetch_gnews": fetch_gnews_cached,
         "dig_deeper_topic": dig_deeper_topic,
         "get_world_snapshot": get_world_snapshot
     }
@@ -39,94 +44,111 @@ def gather_news_content(topic: str, max_iterations: int = 5):
         "all_items": []
     }
     
-    prompt = f"""Research and gather comprehensive news content about: {topic}
+    # Items are deduplicated (by id, else url) as they arrive, up to MAX_ITEMS;
+    # image URLs shared by different items are only kept once
+    seen_ids = set()
+    seen_images = set()
+    
+    def add_unique(items: list, source_items: list = None):
+        """Append items not seen before to all_items (and source_items), collecting their image URLs"""
+        all_items = collected_content["all_items"]
+        for item in items:
+            if len(all_items) >= MAX_ITEMS:
+                break
+            item_id = item.get("id") or item.get("url", "")
+            if not item_id or item_id in seen_ids:
+                continue
+            seen_ids.add(item_id)
+            all_items.append(item)
+            if source_items is not None:
+                source_items.append(item)
+            image_url = item.get("image_url")
+            if image_url and image_url not in seen_images:
+                seen_images.add(image_url)
+                collected_content["image_urls"].append(image_url)
+    
+    # A list/dict topic (e.g. from get_trending_topics) is serialized once, for the prompt and the display
+    topic_text = _json.dumps(topic) if isinstance(topic, (list, dict)) else str(topic)
+    
+    prompt = f"""Research and gather comprehensive news content about: {topic_text}
 
 You have access to news tools. Call them strategically to gather diverse, relevant content.
 Keep calling tools until you have enough quality content (at least 5-10 items from different sources).
 Use dig_deeper_topic for deep research, fetch_reddit for Reddit posts, fetch_gnews for news articles."""
 
     # Format topic for display (handle if it's a list/dict)
-    topic_display = topic
-    if isinstance(topic, (list, dict)):
-        topic_display = "trending topics" if isinstance(topic, list) else str(topic)[:100]
-    elif len(str(topic)) > 200:
-        topic_display = str(topic)[:200] + "..."
+    if isinstance(topic, list):
+        topic_display = "trending topics"
+    elif isinstance(topic, dict):
+        topic_display = topic_text[:100]
+    elif len(topic_text) > 200:
+        topic_display = topic_text[:200] + "..."
+    else:
+        topic_display = topic_text
+    del topic_text
     
+    stalled_iterations = 0
     for iteration in range(max_iterations):
         items_before = len(collected_content["all_items"])
-        print(f"\n📰 Iteration {iteration + 1}: Gathering news about '{topic_display}'...")
-        print(f"   Current items collected: {items_before}")
+        logger.info("📰 Iteration %s: Gathering news about '%s'...", iteration + 1, topic_display)
+        logger.debug("Current items collected: %s", items_before)
         
         # LLM decides which tools to call
-        print("Calling tool caller")
-        response = tool_caller_llm(tools=news_tools, prompt=prompt, step_name="Step 1: Gather News")
-        print(f"Responce afte tool call: {response}")
-        if isinstance(response, dict) and response.get("tool_calls"):
-            for tool_call in response["tool_calls"]:
-                func_name = tool_call.get("function", {}).get("name")
-                try:
-                    args = json.loads(tool_call["function"]["arguments"])
-                except:
-                    args = {}
+        logger.debug("Calling tool caller")
+        response = tool_caller_llm(tools=NEWS_TOOLS_JSON, prompt=prompt, step_name="Step 1: Gather News")
+        logger.debug("Response after tool call: %s", response)
+        if not (isinstance(response, dict) and response.get("tool_calls")):
+            # The model stopped calling tools; another round-trip won't add items
+            logger.info("No tool calls returned, stopping")
+            break
+        calls = []
+        for tool_call in response["tool_calls"]:
+            func_name = tool_call.get("function", {}).get("name")
+            try:
+                args = _json.loads(tool_call["function"]["arguments"])
+            except:
+                args = {}
+            
+            logger.debug("🔧 Calling: %s with %s", func_name, args)
+            calls.append((func_name, args))
+        
+        # The fetches are network-bound, so run them concurrently and fold results in call order
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(calls))) as pool:
+            results = list(pool.map(lambda call: execute_news_tool(call[0], **call[1]), calls))
+        
+        for result in results:
+            if result:
+                # Extract items and image URLs
+                if "reddit_results" in result:
+                    add_unique(result.get("reddit_results", []), collected_content["reddit_items"])
                 
-                print(f"  🔧 Calling: {func_name} with {args}")
-                result = execute_news_tool(func_name, **args)
+                if "gnews_results" in result:
+                    add_unique(result.get("gnews_results", []), collected_content["gnews_items"])
                 
-                if result:
-                    # Extract items and image URLs
-                    if "reddit_results" in result:
-                        items = result.get("reddit_results", [])
-                        collected_content["reddit_items"].extend(items)
-                        collected_content["all_items"].extend(items)
-                        
-                        # Extract image URLs
-                        for item in items:
-                            if item.get("image_url"):
-                                collected_content["image_urls"].append(item["image_url"])
-                    
-                    if "gnews_results" in result:
-                        items = result.get("gnews_results", [])
-                        collected_content["gnews_items"].extend(items)
-                        collected_content["all_items"].extend(items)
-                        
-                        for item in items:
-                            if item.get("image_url"):
-                                collected_content["image_urls"].append(item["image_url"])
-                    
-                    if "items" in result and "reddit_results" not in result and "gnews_results" not in result:
-                        items = result.get("items", [])
-                        collected_content["all_items"].extend(items)
-                        
-                        for item in items:
-                            if item.get("image_url"):
-                                collected_content["image_urls"].append(item["image_url"])
+                if "items" in result and "reddit_results" not in result and "gnews_results" not in result:
+                    add_unique(result.get("items", []))
         
         items_after = len(collected_content["all_items"])
-        print(f"   Items after this iteration: {items_after}")
+        logger.debug("Items after this iteration: %s", items_after)
         
         # Check if we have enough content
-        if items_after >= 1:
-            print(f"✅ Collected enough content ({items_after} items) after {iteration + 1} iterations")
+        if items_after >= MIN_ITEMS:
+            logger.info("✅ Collected enough content (%s items) after %s iterations", items_after, iteration + 1)
+            break
+        
+        # Give up after two iterations in a row without new items
+        stalled_iterations = stalled_iterations + 1 if items_after == items_before else 0
+        if stalled_iterations >= 2:
+            logger.info("No new items in %s iterations, stopping", stalled_iterations)
             break
         
-        # Update prompt with collected content summary (use items_after, not before)
+        # Swap in the short continuation prompt, which drops the full topic text from the first request
         prompt = f"""You've gathered {items_after} items so far about: {topic_display}
 Continue gathering more diverse content. Aim for at least 5-10 quality items."""
     
-    # Remove duplicates
-    seen_ids = set()
-    unique_items = []
-    for item in collected_content["all_items"]:
-        item_id = item.get("id") or item.get("url", "")
-        if item_id and item_id not in seen_ids:
-            seen_ids.add(item_id)
-            unique_items.append(item)
-    
-    collected_content["all_items"] = unique_items[:20]  # Limit to 20 items
-    
-    print(f"\n✅ Collected {len(collected_content['all_items'])} unique news items")
+    logger.info("✅ Collected %s unique news items", len(collected_content['all_items']))
     return collected_content
 
 if __name__ == "__main__":
     result = gather_news_content("AI and Machine Learning")
-    print(json.dumps(result, indent=2))
+    print(_json.dumps(result, pretty=True))
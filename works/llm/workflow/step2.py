@@ -1,11 +1,28 @@
 """
 Step 2: Fetch existing posts from database
 """
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
+import logging
+from functools import lru_cache
+from db.connection import find_all, ensure_index
 
-from db.connection import run_query
+logger = logging.getLogger(__name__)
+
+# Only the fields step 3 reads when summarizing recent posts
+POST_PROJECTION = {
+    "post_text": 1,
+    "post_type": 1,
+    "image_url": 1,
+    "url": 1,
+    "created_at": 1
+}
+
+# Newest first; served by a descending created_at index
+RECENT_SORT = [("created_at", -1)]
+
+@lru_cache(maxsize=1)
+def _ensure_created_at_index():
+    """Create the created_at index once per process"""
+    ensure_index("student", "linkedin_posts", RECENT_SORT)
 
 def get_existing_posts(limit: int = 10):
     """
@@ -17,17 +34,14 @@ def get_existing_posts(limit: int = 10):
     db_name = "student"
     collection_name = "linkedin_posts"
     
-    # Fetch recent posts (you may want to add sorting by created_at)
-    posts = run_query(db_name, collection_name, "find", query={})
-    
-    # Sort by created_at if available, limit results
-    if posts and isinstance(posts, list):
-        try:
-            posts = sorted(posts, key=lambda x: x.get("created_at", ""), reverse=True)[:limit]
-        except:
-            posts = posts[:limit]
+    # Sort and limit on the server so only the newest `limit` posts are transferred
+    try:
+        _ensure_created_at_index()
+    except Exception as e:
+        logger.warning("⚠️ Could not ensure created_at index: %s", e)
+    posts = find_all(db_name, collection_name, query={}, projection=POST_PROJECTION, sort=RECENT_SORT, limit=limit)
     
-    print(f"📋 Fetched {len(posts)} existing posts from database")
+    logger.info("📋 Fetched %s existing posts from database", len(posts))
     return posts
 
 if __name__ == "__main__":
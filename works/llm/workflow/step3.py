@@ -1,36 +1,100 @@
 """
 Step 3: LLM decides post type based on news content and existing posts
 """
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
-
+import logging
 from works.llm.chat import chat_with_meta_llama
 import json
+from works.llm import _json
 import re
+import random
+from itertools import islice
+from urllib.parse import urlparse
 
-def decide_post_type(news_content: dict, existing_posts: list):
+logger = logging.getLogger(__name__)
+
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_first_json(text: str) -> dict:
     """
-    LLM decides what type of post to create (text, url, image)
+    Decode the first JSON object in text in one linear pass; anything around it
+    (markdown fences, prose) is ignored, so replies need no fence-stripping pass first
+    
+    Raises:
+        ValueError: No JSON object in text (json.JSONDecodeError if it is malformed)
+    """
+    stripped = text.strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
+        # Bare JSON reply (the usual case): decode it with the fast parser
+        try:
+            return _json.loads(stripped)
+        except ValueError:
+            pass
+    start = text.find('{')
+    if start == -1:
+        raise ValueError("No JSON object in response")
+    obj, _ = _JSON_DECODER.raw_decode(text, start)
+    return obj
+
+# News image URLs containing any of these (resizers, proxies, CDNs) tend to time out the API
+SKIP_PATTERNS = (
+    'dims4', 'dims/', 'dimensions', 'thumbnail/', 'resize/', 'crop/',
+    'quality/', 'format/', 'preview.redd.it', '?url=', '?w=', '?h=',
+    '%3A%2F%2F', '%2F', '&w=', '&h=', '&q=', 'cdn.', 'proxy.'
+)
+_SKIP_RE = re.compile('|'.join(map(re.escape, SKIP_PATTERNS)), re.IGNORECASE)
+SIMPLE_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+# Image hosts that serve plain image URLs, and our own storage (any *.supabase.co project)
+SAFE_HOSTS = frozenset({'i.redd.it', 'i.imgur.com'})
+SAFE_SUFFIX_HOSTS = ('.supabase.co',)
+
+def _is_simple_image_url(url: str, max_len: int) -> bool:
+    """Short http(s) URL without query or escapes, pointing at an image file or a known image host"""
+    if len(url) >= max_len or '%' in url:
+        return False
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or parsed.query:
+        return False
+    return parsed.path.lower().endswith(SIMPLE_EXTS) or parsed.netloc.lower() in SAFE_HOSTS
+
+DECISION_FORMAT = """{
+    "post_type": "text" | "url" | "image",
+    "text": "substantial post text content (can include URLs as strings)",
+    "url": "url if post_type is url",
+    "title": "title if post_type is url or image",
+    "description": "description if post_type is url or image",
+    "image_prompt": "prompt for image generation if post_type is image",
+    "visibility": "PUBLIC" | "CONNECTIONS"
+}"""
+
+def build_decision_messages(news_content: dict, existing_posts: list, response_spec: str = None):
+    """
+    Build the step 3 chat messages: news and recent-post summaries, safe image URLs and guidelines
+    
+    Args:
+        response_spec: What to return; defaults to a single decision in DECISION_FORMAT
     
     Returns:
-        dict: Decision with post_type, text, and other parameters
+        list: Messages for chat_with_meta_llama
     """
+    if response_spec is None:
+        response_spec = f"Return JSON:\n{DECISION_FORMAT}"
+    
     # Format news content for LLM
-    news_summary = f"""
+    news_parts = [f"""
 News Items Found: {len(news_content.get('all_items', []))}
 Top Items:
-"""
-    for i, item in enumerate(news_content.get('all_items', [])[:5], 1):
-        news_summary += f"{i}. {item.get('title', 'N/A')}\n"
+"""]
+    for i, item in enumerate(islice(news_content.get('all_items', ()), 5), 1):
+        news_parts.append(f"{i}. {item.get('title', 'N/A')}\n")
         if item.get('summary'):
-            news_summary += f"   {item.get('summary', '')[:100]}...\n"
+            news_parts.append(f"   {item.get('summary', '')[:100]}...\n")
         if item.get('url'):
-            news_summary += f"   URL: {item.get('url')}\n"
-        news_summary += "\n"
+            news_parts.append(f"   URL: {item.get('url')}\n")
+        news_parts.append("\n")
+    news_summary = "".join(news_parts)
     
     # Format existing posts with images/URLs
-    existing_summary = f"Recent Posts: {len(existing_posts)}\n"
+    existing_parts = [f"Recent Posts: {len(existing_posts)}\n"]
     existing_post_images = []
     existing_post_urls = []
     
@@ -47,50 +111,36 @@ Top Items:
             existing_post_urls.append(url)
     
     # Format summary for first 3 posts
-    for i, post in enumerate(existing_posts[:3], 1):
+    for i, post in enumerate(islice(existing_posts, 3), 1):
         post_text = post.get('post_text', 'N/A')[:100]
         post_type = post.get('post_type', 'unknown')
-        existing_summary += f"{i}. [{post_type.upper()}] {post_text}...\n"
+        existing_parts.append(f"{i}. [{post_type.upper()}] {post_text}...\n")
         
         img_url = post.get('image_url')
         if img_url:
-            existing_summary += f"   Image URL: {img_url}\n"
+            existing_parts.append(f"   Image URL: {img_url}\n")
         else:
-            existing_summary += f"   (No image)\n"
+            existing_parts.append(f"   (No image)\n")
         
         url = post.get('url')
         if url:
-            existing_summary += f"   Article URL: {url}\n"
+            existing_parts.append(f"   Article URL: {url}\n")
         
-        existing_summary += "\n"
+        existing_parts.append("\n")
+    existing_summary = "".join(existing_parts)
     
     # Filter news image URLs aggressively to avoid API timeouts
     image_urls = news_content.get('image_urls', [])
     valid_image_urls = []
     
-    skip_patterns = [
-        'dims4', 'dims/', 'dimensions', 'thumbnail/', 'resize/', 'crop/',
-        'quality/', 'format/', 'preview.redd.it', '?url=', '?w=', '?h=',
-        '%3A%2F%2F', '%2F', '&w=', '&h=', '&q=', 'cdn.', 'proxy.'
-    ]
-    
     for url in image_urls:
-        if not url or not isinstance(url, str) or not url.startswith(('http://', 'https://')):
-            continue
-        
-        if any(pattern in url.lower() for pattern in skip_patterns):
+        if not url or not isinstance(url, str):
             continue
         
-        if '?' in url or '%' in url:
+        if _SKIP_RE.search(url):
             continue
         
-        is_simple_url = (
-            url.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')) or
-            ('i.redd.it' in url and '?' not in url and '%' not in url) or
-            ('i.imgur.com' in url and '?' not in url and '%' not in url)
-        )
-        
-        if is_simple_url and len(url) < 150:
+        if _is_simple_image_url(url, max_len=150):
             valid_image_urls.append(url)
             if len(valid_image_urls) >= 1:
                 break
@@ -111,16 +161,7 @@ Guidelines:
 - Make the text content substantial and engaging (not short)
 - Choose image_post only if you can create a relevant image_prompt
 
-Return JSON:
-{{
-    "post_type": "text" | "url" | "image",
-    "text": "substantial post text content (can include URLs as strings)",
-    "url": "url if post_type is url",
-    "title": "title if post_type is url or image",
-    "description": "description if post_type is url or image",
-    "image_prompt": "prompt for image generation if post_type is image",
-    "visibility": "PUBLIC" | "CONNECTIONS"
-}}"""
+{response_spec}"""
         }
     ]
     
@@ -135,14 +176,13 @@ Return JSON:
             continue
             
         img_url = img_url.strip()
-        if not img_url.startswith(('http://', 'https://')):
+        parsed = urlparse(img_url)
+        if parsed.scheme not in ('http', 'https'):
             continue
         
         is_safe = (
-            'supabase.co' in img_url or
-            ('?' not in img_url and '%' not in img_url and len(img_url) < 200 and 
-             (img_url.endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')) or
-              'i.redd.it' in img_url or 'i.imgur.com' in img_url))
+            parsed.netloc.lower().endswith(SAFE_SUFFIX_HOSTS) or
+            _is_simple_image_url(img_url, max_len=200)
         )
         
         if is_safe:
@@ -168,69 +208,78 @@ Return JSON:
         }
     ]
     
-    reply = chat_with_meta_llama(messages, step_name="Step 3: Decide Post Type")
+    return messages
+
+def parse_json_reply(reply) -> dict:
+    """
+    Pull the JSON object out of a chat_with_meta_llama reply (tolerates markdown fences)
+
+    Raises:
+        ValueError: Error string, empty or unexpected reply
+        json.JSONDecodeError: Reply text isn't valid JSON
+    """
+    if isinstance(reply, str):
+        raise ValueError("String response received")
     
-    try:
-        if isinstance(reply, str):
-            raise ValueError("String response received")
+    if isinstance(reply, dict):
+        response_data = reply.get("data", "")
+        if not response_data:
+            if "choices" in reply:
+                response_data = reply["choices"][0].get("message", {}).get("content", "")
         
-        if isinstance(reply, dict):
-            response_data = reply.get("data", "")
-            if not response_data:
-                if "choices" in reply:
-                    response_data = reply["choices"][0].get("message", {}).get("content", "")
-            
-            if response_data:
-                response_str = str(response_data).strip()
-                
-                if "```json" in response_str:
-                    response_str = re.sub(r'```json\s*', '', response_str)
-                    response_str = re.sub(r'```\s*$', '', response_str)
-                elif "```" in response_str:
-                    response_str = re.sub(r'```\s*', '', response_str)
-                    response_str = re.sub(r'```\s*$', '', response_str)
-                
-                json_match = re.search(r'\{.*"post_type".*\}', response_str, re.DOTALL)
-                if json_match:
-                    response_str = json_match.group(0)
-                
-                decision = json.loads(response_str)
-                return decision
-            else:
-                raise ValueError("No data in response")
+        if response_data:
+            return extract_first_json(str(response_data))
         else:
-            raise ValueError(f"Unexpected reply type: {type(reply)}")
-            
-    except Exception as e:
-        # Default fallback - create unique content from news
-        import random
-        fallback_text = "Exciting developments in the tech world! 🚀"
-        if news_content.get('all_items'):
-            item = random.choice(news_content['all_items'][:5])
-            title = item.get('title', '')
-            url = item.get('url', '')
-            summary = item.get('summary', '')[:150] if item.get('summary') else ''
-            
-            if url and title:
-                return {
-                    "post_type": "url",
-                    "text": f"{title}\n\n{summary}...\n\nWhat are your thoughts? 💭",
-                    "url": url,
-                    "title": title,
-                    "description": summary,
-                    "visibility": "PUBLIC"
-                }
-            elif title:
-                fallback_text = f"{title}\n\n{summary}...\n\n#TechNews #AI"
+            raise ValueError("No data in response")
+    else:
+        raise ValueError(f"Unexpected reply type: {type(reply)}")
+
+def fallback_decision(news_content: dict) -> dict:
+    """Default decision built from the gathered news when the LLM reply is unusable"""
+    # Create unique content from news
+    fallback_text = "Exciting developments in the tech world! 🚀"
+    if news_content.get('all_items'):
+        item = random.choice(news_content['all_items'][:5])
+        title = item.get('title', '')
+        url = item.get('url', '')
+        summary = item.get('summary', '')[:150] if item.get('summary') else ''
         
-        return {
-            "post_type": "text",
-            "text": fallback_text,
-            "visibility": "PUBLIC"
-        }
+        if url and title:
+            return {
+                "post_type": "url",
+                "text": f"{title}\n\n{summary}...\n\nWhat are your thoughts? 💭",
+                "url": url,
+                "title": title,
+                "description": summary,
+                "visibility": "PUBLIC"
+            }
+        elif title:
+            fallback_text = f"{title}\n\n{summary}...\n\n#TechNews #AI"
+    
+    return {
+        "post_type": "text",
+        "text": fallback_text,
+        "visibility": "PUBLIC"
+    }
+
+def decide_post_type(news_content: dict, existing_posts: list):
+    """
+    LLM decides what type of post to create (text, url, image)
+    
+    Returns:
+        dict: Decision with post_type, text, and other parameters
+    """
+    messages = build_decision_messages(news_content, existing_posts)
+    reply = chat_with_meta_llama(messages, step_name="Step 3: Decide Post Type")
+    
+    try:
+        return parse_json_reply(reply)
+    except Exception as e:
+        logger.warning("⚠️ Could not parse decision JSON: %s", e)
+        return fallback_decision(news_content)
 
 if __name__ == "__main__":
     news = {"all_items": [{"title": "Test", "summary": "Test summary", "url": "https://example.com"}], "image_urls": []}
     posts = []
     decision = decide_post_type(news, posts)
-    print(json.dumps(decision, indent=2))
+    print(_json.dumps(decision, pretty=True))
@@ -1,17 +1,17 @@
 """
 Step 4: Execute post creation (generate image if needed, then post to LinkedIn)
 """
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
-
+import logging
 from works.llm.chat import chat_with_image_model, tool_caller_llm
 from works.llm.tools import linkedin_tools, image_generation_tools
-from works.llm.context import get_llm_context, set_llm_context
+from works.llm.context import append_llm_context
 from main import LinkedInBot
-from db.upload_image import upload_image
-import json
+from db.upload_image import upload_image, delete_image
+from works.llm import _json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
 
 def execute_linkedin_tool(bot: LinkedInBot, tool_name: str, **kwargs):
     """Execute LinkedIn tool functions"""
@@ -28,18 +28,79 @@ def execute_linkedin_tool(bot: LinkedInBot, tool_name: str, **kwargs):
     return None
 
 def add_to_context(step_name: str, action: str, input_data: dict, output_data: dict = None, error: str = None):
-    """Add non-LLM action to context"""
-    context_entry = f"""
+    """Add non-LLM action to context as one entry (a single O(1) append to the chunked context)"""
+    parts = [f"""
 Step: {step_name}
 Action: {action}
-Input: {json.dumps(input_data, indent=2)}
-"""
+Input: {_json.dumps(input_data, pretty=True)}
+"""]
     if error:
-        context_entry += f"Error: {error}\n"
+        parts.append(f"Error: {error}\n")
     elif output_data:
-        context_entry += f"Output: {json.dumps(output_data, indent=2)}\n"
-    context_entry += "---\n"
-    set_llm_context(get_llm_context() + context_entry)
+        parts.append(f"Output: {_json.dumps(output_data, pretty=True)}\n")
+    parts.append("---\n")
+    append_llm_context("".join(parts))
+
+# Appended to the text for the one retry after LinkedIn rejects a post as a duplicate
+DUPLICATE_HASHTAGS = {
+    "text": "\n\n#TechNews #AI",
+    "url": "\n\n#TechNews"
+}
+
+def _is_duplicate_error(error: Exception) -> bool:
+    """LinkedIn answers a repeated post with DUPLICATE_POST / HTTP 422"""
+    error_msg = str(error)
+    return "DUPLICATE_POST" in error_msg or "422" in error_msg
+
+def _publish_with_retry(post_fn, label: str, text: str, hashtags: str, **kwargs):
+    """
+    Publish with post_fn, retrying once with hashtags appended if it's rejected as a duplicate;
+    the outcome is added to the context exactly once
+    
+    Args:
+        post_fn: Bound LinkedInBot create_*_post method
+        label: Post kind for the context step name and logs ("Text", "URL")
+        text: Post text
+        hashtags: Suffix for the duplicate retry
+        **kwargs: Remaining post_fn arguments (all but description are echoed into the context)
+    
+    Returns:
+        str: Post URN, or None if it failed
+    """
+    step = f"Step 4: Create {label} Post"
+    action = post_fn.__name__
+    context_input = {k: v for k, v in kwargs.items() if k != "description"}
+    try:
+        post_id = post_fn(text=text, **kwargs)
+        add_to_context(step, action, {"text": text[:100] + "...", **context_input}, {"post_id": post_id})
+        return post_id
+    except Exception as e:
+        error = e
+    
+    if not _is_duplicate_error(error):
+        add_to_context(step, action, {"text": text[:100] + "...", **context_input}, error=str(error))
+        logger.error("❌ Error creating %s post: %s", label, error)
+        return None
+    
+    logger.warning("⚠️ Duplicate %s post detected. Modifying text...", label)
+    text_variation = text + hashtags
+    try:
+        post_id = post_fn(text=text_variation, **kwargs)
+    except Exception:
+        add_to_context(step, action, {"text": text[:100] + "...", **context_input}, error=str(error))
+        logger.error("❌ Still failed after variation: %s", error)
+        return None
+    add_to_context(f"{step} (Retry)", action, {"text": text_variation[:100] + "...", **context_input}, {"post_id": post_id})
+    return post_id
+
+def _discard_upload(upload_future):
+    """Cancel the background upload for a post that failed, or delete the image if it was already uploaded"""
+    if upload_future.cancel():
+        return
+    try:
+        delete_image(upload_future.result())
+    except Exception as e:
+        logger.warning("⚠️ Could not remove the uploaded image of the failed post: %s", e)
 
 def create_post(bot: LinkedInBot, decision: dict):
     """
@@ -50,173 +111,82 @@ def create_post(bot: LinkedInBot, decision: dict):
     """
     post_type = decision.get("post_type", "text")
     text = decision.get("text", "")
+    title = decision.get("title")
     visibility = decision.get("visibility", "PUBLIC")
     
-    print(f"\n📮 Creating {post_type} post...")
+    logger.info("📮 Creating %s post...", post_type)
     
     if post_type == "image":
         # Generate image first
         image_prompt = decision.get("image_prompt", "Professional LinkedIn post image")
-        print(f"🎨 Generating image with prompt: {image_prompt}")
+        logger.info("🎨 Generating image with prompt: %s", image_prompt)
         
         image_result = chat_with_image_model(prompt=image_prompt, step_name="Step 4: Generate Image")
         image_path = "generated_image.png"  # Default path from chat.py
         
         if os.path.exists(image_path):
-            # Create image post
-            try:
-                post_id = bot.create_image_post(
-                    text=text,
-                    image_path=image_path,
-                    title=decision.get("title"),
-                    description=decision.get("description"),
-                    visibility=visibility
-                )
-                add_to_context(
-                    "Step 4: Create Image Post",
-                    "create_image_post",
-                    {"text": text[:100] + "...", "image_path": image_path, "title": decision.get("title"), "visibility": visibility},
-                    {"post_id": post_id}
-                )
-            except Exception as e:
-                add_to_context(
-                    "Step 4: Create Image Post",
-                    "create_image_post",
-                    {"text": text[:100] + "...", "image_path": image_path},
-                    error=str(e)
-                )
-                raise
-            
-            # Upload image to Supabase and get public URL
-            try:
-                print("☁️ Uploading image to Supabase...")
-                public_image_url = upload_image(image_path)
-                decision["image_url"] = public_image_url
-                print(f"✅ Image uploaded to Supabase: {public_image_url}")
-                add_to_context(
-                    "Step 4: Upload Image",
-                    "upload_image",
-                    {"image_path": image_path},
-                    {"public_url": public_image_url}
-                )
-            except Exception as e:
-                print(f"⚠️ Failed to upload image to Supabase: {e}")
-                decision["image_url"] = image_path
-                add_to_context(
-                    "Step 4: Upload Image",
-                    "upload_image",
-                    {"image_path": image_path},
-                    error=str(e)
-                )
-            
-            return post_id
-        else:
-            print("⚠️ Image not generated, falling back to text post")
-            post_type = "text"
-    
-    if post_type == "url":
-        try:
-            post_id = bot.create_url_post(
-                text=text,
-                url=decision.get("url", ""),
-                title=decision.get("title"),
-                description=decision.get("description"),
-                visibility=visibility
-            )
-            add_to_context(
-                "Step 4: Create URL Post",
-                "create_url_post",
-                {"text": text[:100] + "...", "url": decision.get("url"), "title": decision.get("title"), "visibility": visibility},
-                {"post_id": post_id}
-            )
-            return post_id
-        except Exception as e:
-            error_msg = str(e)
-            if "DUPLICATE_POST" in error_msg or "422" in error_msg:
-                print(f"⚠️ Duplicate URL post detected. Modifying text...")
-                text_variation = text + "\n\n#TechNews"
+            # The Supabase upload (public URL for the DB record) and the LinkedIn post both only
+            # read the local file, so the upload runs in the background while the post is created
+            context_input = {"text": text[:100] + "...", "image_path": image_path, "title": title, "visibility": visibility}
+            logger.info("☁️ Uploading image to Supabase...")
+            # Scoped to this post: leaving the block joins the upload, so it never outlives the workflow run
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-upload") as upload_pool:
+                upload_future = upload_pool.submit(upload_image, image_path)
                 try:
-                    post_id = bot.create_url_post(
-                        text=text_variation,
-                        url=decision.get("url", ""),
-                        title=decision.get("title"),
+                    post_id = bot.create_image_post(
+                        text=text,
+                        image_path=image_path,
+                        title=title,
                         description=decision.get("description"),
                         visibility=visibility
                     )
+                    add_to_context("Step 4: Create Image Post", "create_image_post", context_input, {"post_id": post_id})
+                except Exception as e:
+                    add_to_context("Step 4: Create Image Post", "create_image_post", context_input, error=str(e))
+                    # Don't leave an image in the bucket with no post to go with it
+                    _discard_upload(upload_future)
+                    raise
+                
+                # Upload image to Supabase and get public URL
+                try:
+                    public_image_url = upload_future.result()
+                    decision["image_url"] = public_image_url
+                    logger.info("✅ Image uploaded to Supabase: %s", public_image_url)
                     add_to_context(
-                        "Step 4: Create URL Post (Retry)",
-                        "create_url_post",
-                        {"text": text_variation[:100] + "...", "url": decision.get("url"), "visibility": visibility},
-                        {"post_id": post_id}
+                        "Step 4: Upload Image",
+                        "upload_image",
+                        {"image_path": image_path},
+                        {"public_url": public_image_url}
                     )
-                    return post_id
-                except:
+                except Exception as e:
+                    logger.warning("⚠️ Failed to upload image to Supabase: %s", e)
+                    decision["image_url"] = image_path
                     add_to_context(
-                        "Step 4: Create URL Post",
-                        "create_url_post",
-                        {"text": text[:100] + "...", "url": decision.get("url")},
+                        "Step 4: Upload Image",
+                        "upload_image",
+                        {"image_path": image_path},
                         error=str(e)
                     )
-                    print(f"❌ Still failed: {e}")
-                    return None
-            else:
-                add_to_context(
-                    "Step 4: Create URL Post",
-                    "create_url_post",
-                    {"text": text[:100] + "...", "url": decision.get("url")},
-                    error=str(e)
-                )
-                print(f"❌ Error creating URL post: {e}")
-                return None
+            
+            return post_id
+        else:
+            logger.warning("⚠️ Image not generated, falling back to text post")
+            post_type = "text"
+    
+    if post_type == "url":
+        return _publish_with_retry(
+            bot.create_url_post, "URL", text, DUPLICATE_HASHTAGS["url"],
+            url=decision.get("url", ""),
+            title=title,
+            description=decision.get("description"),
+            visibility=visibility
+        )
     
     if post_type == "text":
-        try:
-            post_id = bot.create_text_post(
-                text=text,
-                visibility=visibility
-            )
-            add_to_context(
-                "Step 4: Create Text Post",
-                "create_text_post",
-                {"text": text[:100] + "...", "visibility": visibility},
-                {"post_id": post_id}
-            )
-            return post_id
-        except Exception as e:
-            error_msg = str(e)
-            if "DUPLICATE_POST" in error_msg or "422" in error_msg:
-                print(f"⚠️ Duplicate post detected. Modifying text slightly...")
-                text_variation = text + "\n\n#TechNews #AI"
-                try:
-                    post_id = bot.create_text_post(
-                        text=text_variation,
-                        visibility=visibility
-                    )
-                    add_to_context(
-                        "Step 4: Create Text Post (Retry)",
-                        "create_text_post",
-                        {"text": text_variation[:100] + "...", "visibility": visibility},
-                        {"post_id": post_id}
-                    )
-                    return post_id
-                except:
-                    add_to_context(
-                        "Step 4: Create Text Post",
-                        "create_text_post",
-                        {"text": text[:100] + "..."},
-                        error=str(e)
-                    )
-                    print(f"❌ Still failed after variation: {e}")
-                    return None
-            else:
-                add_to_context(
-                    "Step 4: Create Text Post",
-                    "create_text_post",
-                    {"text": text[:100] + "..."},
-                    error=str(e)
-                )
-                print(f"❌ Error creating post: {e}")
-                return None
+        return _publish_with_retry(
+            bot.create_text_post, "Text", text, DUPLICATE_HASHTAGS["text"],
+            visibility=visibility
+        )
     
     return None
 
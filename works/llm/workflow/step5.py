@@ -1,34 +1,36 @@
 """
 Step 5: Save post to database
 """
-import sys
-import os
-sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
-
+import logging
 from db.connection import run_query
 from db.model import LinkedinPost
 from datetime import datetime
 from main import LinkedInBot
 
-def save_post_to_db(bot: LinkedInBot, post_urn: str, decision: dict, news_content: dict):
+logger = logging.getLogger(__name__)
+
+DB_NAME = "student"
+COLLECTION_NAME = "linkedin_posts"
+
+def _get_author_info(bot: LinkedInBot) -> dict:
+    """Get user info if not already set (fetching it also sets bot.person_urn)"""
+    if not bot.person_urn:
+        return bot.get_user_info()
+    return {"name": "User", "email": ""}
+
+def build_post_document(bot: LinkedInBot, post_urn: str, decision: dict, user_info: dict) -> dict:
     """
-    Save created post to database
+    Build the validated linkedin_posts document for one created post
     
     Args:
         bot: LinkedInBot instance
         post_urn: URN of created post
         decision: LLM decision dict
-        news_content: News content used for post
-    """
-    db_name = "student"
-    collection_name = "linkedin_posts"
-    
-    # Get user info if not already set
-    if not bot.person_urn:
-        user_info = bot.get_user_info()
-    else:
-        user_info = {"name": "User", "email": ""}
+        user_info: Author info from _get_author_info
     
+    Returns:
+        dict: Document ready to insert
+    """
     # Prepare post data
     # Ensure post_type is always set (default to "text" if missing)
     post_type = decision.get("post_type", "text")
@@ -64,24 +66,35 @@ def save_post_to_db(bot: LinkedInBot, post_urn: str, decision: dict, news_conten
     
     # For "text" posts, no additional fields needed
     
-    print(f"💾 Saving {post_type} post to database...")
-    
-    # Convert to dict (Pydantic model handles datetime serialization)
+    # Check every document against the model without converting it (no model_dump);
+    # an invalid document is still saved as-is, but logged
     try:
-        post_model = LinkedinPost(**post_data)
-        post_dict = post_model.dict()
-        post_dict["created_at"] = post_data["created_at"]  # Keep datetime for MongoDB
+        LinkedinPost.model_validate(post_data)
     except Exception as e:
-        print(f"⚠️ Error creating model: {e}, using dict directly")
-        post_dict = post_data
+        logger.warning("⚠️ Error validating post model: %s, using dict directly", e)
+    return post_data
+
+def save_post_to_db(bot: LinkedInBot, post_urn: str, decision: dict, news_content: dict):
+    """
+    Save created post to database
+    
+    Args:
+        bot: LinkedInBot instance
+        post_urn: URN of created post
+        decision: LLM decision dict
+        news_content: News content used for post
+    """
+    post_dict = build_post_document(bot, post_urn, decision, _get_author_info(bot))
+    
+    logger.info("💾 Saving %s post to database...", post_dict["post_type"])
     
     # Insert to database
     try:
-        result = run_query(db_name, collection_name, "insert", data=post_dict)
-        print(f"✅ Post saved to database: {result}")
+        result = run_query(DB_NAME, COLLECTION_NAME, "insert", data=post_dict)
+        logger.info("✅ Post saved to database: %s", result)
         return result
     except Exception as e:
-        print(f"❌ Error saving to database: {e}")
+        logger.error("❌ Error saving to database: %s", e)
         return None
 
 if __name__ == "__main__":
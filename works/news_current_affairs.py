@@ -4,11 +4,20 @@ Combines Reddit and GNews for clean, LLM-friendly news feeds
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import heapq
 import html
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from works.llm import _json
 
 load_dotenv()
 
@@ -20,15 +29,37 @@ REDDIT_HEADERS = {
 # GNews API Key (from environment)
 GNEWS_API_KEY = os.getenv('GNEWS_API_KEY', '')
 
+# Direct image links: extension at the end of the path, optionally followed by a query/fragment.
+# One C-level search; measured faster than splitting off the extension for a frozenset lookup
+_IMG_EXT_RE = re.compile(r'\.(?:jpe?g|png|gif|webp)(?:[?#]|$)', re.IGNORECASE)
+
+# Shared keep-alive session: repeat calls to Reddit/GNews skip the TCP+TLS handshake.
+# Sized for the concurrent fetches in get_world_snapshot/dig_deeper_topic; retries transient gateway errors briefly
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+))
+
 
 def is_english(text: str) -> bool:
     """Check if text is English (simple heuristic)"""
     if not text or len(text.strip()) < 10:
         return False
     
-    # Simple check: English has more common English characters
-    english_chars = sum(1 for c in text if c.isascii() and c.isalnum())
-    total_chars = sum(1 for c in text if c.isalnum())
+    # Fast path: all-ASCII text (most posts) is one C-level check, plus any letter or digit
+    if text.isascii():
+        return any(c.isalnum() for c in text)
+    
+    # Simple check: English has more common English characters (counted in one pass)
+    english_chars = 0
+    total_chars = 0
+    for c in text:
+        if c.isalnum():
+            total_chars += 1
+            if c.isascii():
+                english_chars += 1
     
     if total_chars == 0:
         return False
@@ -45,8 +76,13 @@ def clean_text(text: str, max_length: int = 220) -> str:
     # Unescape HTML entities
     text = html.unescape(text)
     
-    # Remove extra whitespace and newlines
-    text = ' '.join(text.split())
+    # Remove extra whitespace and newlines. A word plus its separator is at least 2 chars, so only
+    # the first max_length // 2 + 2 words can reach the cut; the rest of a long selftext is never split
+    max_words = max_length // 2 + 2
+    words = text.split(None, max_words)
+    if len(words) > max_words:
+        words.pop()  # unsplit remainder
+    text = ' '.join(words)
     
     # Truncate
     if len(text) > max_length:
@@ -55,7 +91,7 @@ def clean_text(text: str, max_length: int = 220) -> str:
     return text.strip()
 
 
-def fetch_reddit(subreddit: str = "technology", query: str = "", limit: int = 5, sort: str = "new") -> Dict:
+def fetch_reddit(subreddit: str = "technology", query: str = "", limit: int = 5, sort: str = "new", timestamp: Optional[str] = None) -> Dict:
     """
     Fetch posts from Reddit
     
@@ -64,10 +100,14 @@ def fetch_reddit(subreddit: str = "technology", query: str = "", limit: int = 5,
         query: Search query
         limit: Number of posts to fetch
         sort: Sort order (new, hot, top)
+        timestamp: ISO timestamp for the result (defaults to now)
     
     Returns:
         dict: Cleaned Reddit posts
     """
+    if timestamp is None:
+        timestamp = datetime.utcnow().isoformat()
+    
     try:
         if query:
             url = f"https://www.reddit.com/r/{subreddit}/search.json"
@@ -81,29 +121,32 @@ def fetch_reddit(subreddit: str = "technology", query: str = "", limit: int = 5,
             url = f"https://www.reddit.com/r/{subreddit}/{sort}.json"
             params = {"limit": min(limit, 25)}
         
-        response = requests.get(url, headers=REDDIT_HEADERS, params=params, timeout=10)
+        response = SESSION.get(url, headers=REDDIT_HEADERS, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = _json.loads(response.content)
         
         items = []
         
         for child in data.get("data", {}).get("children", []):
             post = child.get("data", {})
             
-            # Combine title and text for language check
             title = post.get("title", "")
             selftext = post.get("selftext", "")
-            text_blob = f"{title} {selftext}"
             
-            # Skip non-English posts
-            if not is_english(text_blob):
+            # Skip non-English posts: a language tag on the post decides when present,
+            # otherwise fall back to the heuristic over title and text
+            lang = post.get("lang")
+            if lang:
+                if not str(lang).lower().startswith("en"):
+                    continue
+            elif not is_english(f"{title} {selftext}"):
                 continue
             
             # Extract image URL if available
             image_url = ""
             if post.get("url_overridden_by_dest"):
                 url_dest = post["url_overridden_by_dest"]
-                if any(ext in url_dest.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
+                if _IMG_EXT_RE.search(url_dest):
                     image_url = url_dest
             elif post.get("preview", {}).get("images"):
                 try:
@@ -135,7 +178,7 @@ def fetch_reddit(subreddit: str = "technology", query: str = "", limit: int = 5,
             "category": subreddit,
             "query": query,
             "items": items,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
         
     except Exception as e:
@@ -146,11 +189,11 @@ def fetch_reddit(subreddit: str = "technology", query: str = "", limit: int = 5,
             "query": query,
             "items": [],
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
 
 
-def fetch_gnews(topic: str = "technology", limit: int = 5, lang: str = "en") -> Dict:
+def fetch_gnews(topic: str = "technology", limit: int = 5, lang: str = "en", timestamp: Optional[str] = None) -> Dict:
     """
     Fetch news from GNews API
     
@@ -158,17 +201,21 @@ def fetch_gnews(topic: str = "technology", limit: int = 5, lang: str = "en") ->
         topic: News topic (technology, world, business, sports, etc.)
         limit: Number of articles
         lang: Language code
+        timestamp: ISO timestamp for the result (defaults to now)
     
     Returns:
         dict: Cleaned GNews articles
     """
+    if timestamp is None:
+        timestamp = datetime.utcnow().isoformat()
+    
     if not GNEWS_API_KEY:
         return {
             "source": "gnews",
             "category": topic,
             "items": [],
             "error": "GNews API key not configured",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
     
     try:
@@ -180,9 +227,9 @@ def fetch_gnews(topic: str = "technology", limit: int = 5, lang: str = "en") ->
             "token": GNEWS_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = SESSION.get(url, params=params, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = _json.loads(response.content)
         
         items = []
         
@@ -207,7 +254,7 @@ def fetch_gnews(topic: str = "technology", limit: int = 5, lang: str = "en") ->
             "source": "gnews",
             "category": topic,
             "items": items,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
         
     except Exception as e:
@@ -217,10 +264,35 @@ def fetch_gnews(topic: str = "technology", limit: int = 5, lang: str = "en") ->
             "category": topic,
             "items": [],
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
 
 
+# GNews free tier allows ~10 requests/min, so identical fetches within a minute share one response
+GNEWS_CACHE_TTL = 60  # seconds
+_gnews_cache: Dict[tuple, tuple] = {}
+_gnews_cache_lock = threading.Lock()
+
+
+def fetch_gnews_cached(topic: str = "technology", limit: int = 5, lang: str = "en") -> Dict:
+    """fetch_gnews, reusing a successful response for the same arguments for GNEWS_CACHE_TTL seconds"""
+    key = (topic, limit, lang)
+    now = time.monotonic()
+    with _gnews_cache_lock:
+        hit = _gnews_cache.get(key)
+    if hit and now - hit[0] < GNEWS_CACHE_TTL:
+        return hit[1]
+    
+    result = fetch_gnews(topic, limit=limit, lang=lang)
+    # Errors (missing key, rate limit) aren't cached so the next call tries again
+    if not result.get("error"):
+        with _gnews_cache_lock:
+            for stale in [k for k, (t, _) in _gnews_cache.items() if now - t >= GNEWS_CACHE_TTL]:
+                del _gnews_cache[stale]
+            _gnews_cache[key] = (now, result)
+    return result
+
+
 def get_world_snapshot(categories: Optional[List[str]] = None) -> Dict:
     """
     Get combined news snapshot from multiple sources
@@ -235,6 +307,8 @@ def get_world_snapshot(categories: Optional[List[str]] = None) -> Dict:
         categories = ["tech", "programming", "world", "politics"]
     
     snapshot = {}
+    # One timestamp for the whole snapshot and every fetch in it
+    fetched_at = datetime.utcnow().isoformat()
     
     # Reddit sources
     reddit_sources = {
@@ -253,22 +327,74 @@ def get_world_snapshot(categories: Optional[List[str]] = None) -> Dict:
         "science": "science"
     }
     
-    # Fetch Reddit posts
-    for cat in categories:
-        if cat in reddit_sources:
-            subreddit, query = reddit_sources[cat]
-            snapshot[cat] = fetch_reddit(subreddit, query, limit=5)
-        elif cat in gnews_sources:
-            topic = gnews_sources[cat]
-            snapshot[cat] = fetch_gnews(topic, limit=5)
+    # Fetch every category concurrently (network-bound), keeping the requested order
+    known = [cat for cat in categories if cat in reddit_sources or cat in gnews_sources]
+    if known:
+        with ThreadPoolExecutor(max_workers=len(known)) as pool:
+            futures = {}
+            for cat in known:
+                if cat in reddit_sources:
+                    subreddit, query = reddit_sources[cat]
+                    futures[cat] = pool.submit(fetch_reddit, subreddit, query, limit=5, timestamp=fetched_at)
+                else:
+                    futures[cat] = pool.submit(fetch_gnews_cached, gnews_sources[cat], limit=5)
+            for cat, future in futures.items():
+                snapshot[cat] = future.result()
     
     return {
         "snapshot": snapshot,
-        "fetched_at": datetime.utcnow().isoformat(),
+        "fetched_at": fetched_at,
         "total_categories": len(snapshot)
     }
 
 
+def search_gnews(topic: str, max_results: int = 10) -> List[Dict]:
+    """
+    Search GNews articles for a topic, falling back to general headlines on error
+    
+    Args:
+        topic: Search query
+        max_results: Maximum number of articles
+    
+    Returns:
+        list: Cleaned GNews articles
+    """
+    try:
+        # Try search endpoint if available, otherwise use topic-based
+        url = "https://gnews.io/api/v4/search"
+        params = {
+            "q": topic,
+            "lang": "en",
+            "max": max_results,
+            "token": GNEWS_API_KEY
+        }
+        
+        articles = []
+        response = SESSION.get(url, params=params, timeout=10)
+        if response.status_code == 200:
+            data = _json.loads(response.content)
+            for article in data.get("articles", []):
+                if is_english(f"{article.get('title', '')} {article.get('description', '')}"):
+                    articles.append({
+                        "id": article.get("url", ""),
+                        "title": clean_text(article.get("title", ""), 120),
+                        "summary": clean_text(article.get("description", "")),
+                        "source": article.get("source", {}).get("name", "Unknown"),
+                        "url": article.get("url", ""),
+                        "image_url": article.get("image", ""),
+                        "published_at": article.get("publishedAt", "")
+                    })
+        return articles
+    except Exception as e:
+        print(f"  ⚠ GNews search error: {str(e)}")
+        # Fallback to topic-based fetch
+        try:
+            data = fetch_gnews_cached("general", limit=max_results)
+            return data.get("items", [])
+        except:
+            return []
+
+
 def dig_deeper_topic(topic: str, max_results: int = 10) -> Dict:
     """
     Deep dive into a specific topic across multiple sources
@@ -281,12 +407,13 @@ def dig_deeper_topic(topic: str, max_results: int = 10) -> Dict:
     Returns:
         dict: Comprehensive results from Reddit and GNews
     """
+    searched_at = datetime.utcnow().isoformat()
     results = {
         "topic": topic,
         "reddit_results": [],
         "gnews_results": [],
         "total_items": 0,
-        "searched_at": datetime.utcnow().isoformat()
+        "searched_at": searched_at
     }
     
     # Search Reddit across multiple relevant subreddits
@@ -299,61 +426,29 @@ def dig_deeper_topic(topic: str, max_results: int = 10) -> Dict:
     ]
     
     print(f"🔍 Searching Reddit for: {topic}")
-    for subreddit, query in reddit_subreddits:
-        try:
-            data = fetch_reddit(subreddit, query, limit=max_results, sort="relevance")
-            if data.get("items"):
-                results["reddit_results"].extend(data["items"])
-        except Exception as e:
-            print(f"  ⚠ Error searching r/{subreddit}: {str(e)}")
-    
-    # Remove duplicates from Reddit results
-    seen_ids = set()
-    unique_reddit = []
-    for item in results["reddit_results"]:
-        if item["id"] not in seen_ids:
-            seen_ids.add(item["id"])
-            unique_reddit.append(item)
-    results["reddit_results"] = unique_reddit[:max_results]
-    
-    # Search GNews
     print(f"🔍 Searching GNews for: {topic}")
-    if GNEWS_API_KEY:
-        try:
-            # Try search endpoint if available, otherwise use topic-based
-            url = "https://gnews.io/api/v4/search"
-            params = {
-                "q": topic,
-                "lang": "en",
-                "max": max_results,
-                "token": GNEWS_API_KEY
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                for article in data.get("articles", []):
-                    if is_english(f"{article.get('title', '')} {article.get('description', '')}"):
-                        results["gnews_results"].append({
-                            "id": article.get("url", ""),
-                            "title": clean_text(article.get("title", ""), 120),
-                            "summary": clean_text(article.get("description", "")),
-                            "source": article.get("source", {}).get("name", "Unknown"),
-                            "url": article.get("url", ""),
-                            "image_url": article.get("image", ""),
-                            "published_at": article.get("publishedAt", "")
-                        })
-        except Exception as e:
-            print(f"  ⚠ GNews search error: {str(e)}")
-            # Fallback to topic-based fetch
-            try:
-                data = fetch_gnews("general", limit=max_results)
-                results["gnews_results"] = data.get("items", [])
-            except:
-                pass
-    else:
+    if not GNEWS_API_KEY:
         print("  ⚠ GNews API key not configured")
     
+    # Deduplicate by post id as results arrive; the dict keeps first-seen order
+    unique_reddit = {}
+    # The GNews search shares the pool, so it overlaps with the Reddit searches
+    with ThreadPoolExecutor(max_workers=len(reddit_subreddits) + 1) as pool:
+        gnews_future = pool.submit(search_gnews, topic, max_results) if GNEWS_API_KEY else None
+        futures = [
+            (subreddit, pool.submit(fetch_reddit, subreddit, query, limit=max_results, sort="relevance", timestamp=searched_at))
+            for subreddit, query in reddit_subreddits
+        ]
+        for subreddit, future in futures:
+            try:
+                for item in future.result().get("items", []):
+                    unique_reddit.setdefault(item["id"], item)
+            except Exception as e:
+                print(f"  ⚠ Error searching r/{subreddit}: {str(e)}")
+        if gnews_future:
+            results["gnews_results"] = gnews_future.result()
+    results["reddit_results"] = list(islice(unique_reddit.values(), max_results))
+    
     results["total_items"] = len(results["reddit_results"]) + len(results["gnews_results"])
     
     return results
@@ -374,17 +469,17 @@ def get_trending_topics(limit: int = 10) -> List[Dict]:
         subreddits = ["technology", "programming", "worldnews", "science"]
         all_posts = []
         
-        for subreddit in subreddits:
-            data = fetch_reddit(subreddit, limit=5, sort="hot")
-            all_posts.extend(data.get("items", []))
+        with ThreadPoolExecutor(max_workers=len(subreddits)) as pool:
+            for data in pool.map(lambda subreddit: fetch_reddit(subreddit, limit=5, sort="hot"), subreddits):
+                all_posts.extend(data.get("items", []))
         
-        # Sort by score and get top topics
-        all_posts.sort(key=lambda x: x.get("score", 0), reverse=True)
+        # Top-scored posts only (same order as a full descending sort, without sorting everything)
+        top_posts = heapq.nlargest(limit * 2, all_posts, key=lambda x: x.get("score", 0))
         
         topics = []
         seen_titles = set()
         
-        for post in all_posts[:limit * 2]:  # Get more to filter duplicates
+        for post in top_posts:  # Get more to filter duplicates
             title = post.get("title", "")
             if title and title not in seen_titles:
                 seen_titles.add(title)
@@ -426,7 +521,7 @@ def get_news_feed(category: str = "tech", limit: int = 5) -> Dict:
         }
         return fetch_reddit(subreddit_map.get(category, "technology"), limit=limit)
     else:
-        return fetch_gnews(category, limit=limit)
+        return fetch_gnews_cached(category, limit=limit)
 
 
 # Example usage
@@ -3,18 +3,65 @@ LinkedIn Scraper using Playwright
 Function-based approach with human-like behavior to avoid bot detection
 """
 
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeoutError
 import time
 import os
 import random
 import csv
+import logging
+import queue
 import re
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# Shared by every browser thread (see scrape_accounts): at most MAX_CONCURRENT_ACTIONS page loads/scrolls/clicks
+# in flight per host, and at most MAX_ACTIONS_PER_WINDOW of them in any sliding ACTION_WINDOW_SECONDS
+LINKEDIN_HOST = 'linkedin.com'
+MAX_CONCURRENT_ACTIONS = 4
+MAX_ACTIONS_PER_WINDOW = 30
+ACTION_WINDOW_SECONDS = 60
+
+_host_semaphores: Dict[str, threading.Semaphore] = {}
+_host_action_times: Dict[str, deque] = {}
+_rate_lock = threading.Lock()
+
+
+@contextmanager
+def rate_limit(host: str = LINKEDIN_HOST):
+    """
+    Wrap a page action against host: waits for a free slot and for room in the sliding window
+    
+    Args:
+        host: Host the action talks to
+    """
+    with _rate_lock:
+        semaphore = _host_semaphores.setdefault(host, threading.Semaphore(MAX_CONCURRENT_ACTIONS))
+        action_times = _host_action_times.setdefault(host, deque())
+    
+    with semaphore:
+        while True:
+            with _rate_lock:
+                now = time.monotonic()
+                while action_times and now - action_times[0] >= ACTION_WINDOW_SECONDS:
+                    action_times.popleft()
+                if len(action_times) < MAX_ACTIONS_PER_WINDOW:
+                    action_times.append(now)
+                    break
+                wait = ACTION_WINDOW_SECONDS - (now - action_times[0])
+            logger.info("  ⏳ Rate limit for %s reached, waiting %.0fs...", host, wait)
+            time.sleep(wait)
+        yield
+
 
 def random_delay(min_seconds: float = 0.5, max_seconds: float = 2.0):
     """Add random delay to simulate human behavior"""
@@ -22,26 +69,94 @@ def random_delay(min_seconds: float = 0.5, max_seconds: float = 2.0):
 
 
 def human_type(page: Page, selector: str, text: str):
-    """Type text character by character with random delays like a human"""
+    """Type text with a random per-keystroke delay like a human (one Playwright call per field)"""
+    move_mouse_to(page, selector)
     page.click(selector)
     random_delay(0.3, 0.8)
     
-    for char in text:
-        page.type(selector, char, delay=random.randint(50, 150))
+    # The browser paces the keystrokes itself, instead of one round-trip per character
+    page.type(selector, text, delay=random.randint(50, 150))
     
     random_delay(0.2, 0.5)
 
 
+# Last known cursor position per page, so each move starts where the previous one ended
+_MOUSE_POSITIONS = weakref.WeakKeyDictionary()
+
+
+def ease_in_out_cubic(t: float) -> float:
+    """Slow start, fast middle, slow finish - the shape of a human hand movement"""
+    return 4 * t * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 3 / 2
+
+
+def eased_move(page: Page, x: float, y: float, steps: Optional[int] = None):
+    """Move the mouse along an eased path from its tracked position to (x, y) instead of teleporting"""
+    start_x, start_y = _MOUSE_POSITIONS.get(page, (random.randint(0, 400), random.randint(0, 300)))
+    steps = steps or random.randint(8, 25)
+    # Bound once as locals: this loop runs up to 25 times per move
+    move, sleep, uniform = page.mouse.move, time.sleep, random.uniform
+    dx, dy = x - start_x, y - start_y
+    for step in range(1, steps + 1):
+        progress = ease_in_out_cubic(step / steps)
+        move(start_x + dx * progress, start_y + dy * progress)
+        sleep(uniform(0.01, 0.03))
+    _MOUSE_POSITIONS[page] = (x, y)
+
+
+def move_mouse_to(page: Page, selector: str):
+    """Glide the mouse to a random point near the centre of the element (before clicking it)"""
+    try:
+        box = page.locator(selector).first.bounding_box()
+        if box:
+            eased_move(page,
+                       box['x'] + box['width'] / 2 + random.uniform(-box['width'] / 6, box['width'] / 6),
+                       box['y'] + box['height'] / 2 + random.uniform(-box['height'] / 6, box['height'] / 6))
+    except:
+        pass
+
+
 def move_mouse_randomly(page: Page):
     """Move mouse to random positions to simulate human behavior"""
     try:
         x = random.randint(100, 800)
         y = random.randint(100, 600)
-        page.mouse.move(x, y)
+        eased_move(page, x, y)
     except:
         pass
 
 
+# How long a manual security challenge may take, and the URLs that mean it was passed
+CHALLENGE_TIMEOUT_MS = 180000
+CHALLENGE_DONE_URL_RE = re.compile(r'feed|mynetwork')
+# Pages a submitted login can end up on (success or security challenge)
+LOGIN_RESULT_URL_RE = re.compile(r'feed|mynetwork|checkpoint|challenge')
+LOGIN_RESULT_TIMEOUT_MS = 15000
+
+
+# Cookies + localStorage saved after a successful login; LinkedIn sessions stay valid for weeks
+AUTH_STATE_PATH = os.getenv('LINKEDIN_AUTH_STATE', 'linkedin_auth.json')
+
+
+def has_valid_session(page: Page) -> bool:
+    """
+    Check whether the browser context is already logged in (e.g. from a saved storage state)
+    
+    Args:
+        page: Playwright page object
+    
+    Returns:
+        bool: True if the feed opens without redirecting to login
+    """
+    try:
+        with rate_limit():
+            page.goto('https://www.linkedin.com/feed', wait_until='domcontentloaded', timeout=30000)
+        random_delay(1, 2)
+        return 'feed' in page.url and 'login' not in page.url
+    except Exception as e:
+        logger.warning("  ⚠ Could not check saved session: %s", e)
+        return False
+
+
 def login_to_linkedin(page: Page, email: str, password: str) -> bool:
     """
     Step 1: Login to LinkedIn with human-like behavior
@@ -54,19 +169,20 @@ def login_to_linkedin(page: Page, email: str, password: str) -> bool:
     Returns:
         bool: True if login successful, False otherwise
     """
-    print("Step 1: Logging into LinkedIn...")
+    logger.info("Step 1: Logging into LinkedIn...")
     
     try:
         # Navigate to LinkedIn login page
-        print("→ Navigating to LinkedIn login page...")
+        logger.info("→ Navigating to LinkedIn login page...")
         try:
-            response = page.goto('https://www.linkedin.com/login', wait_until='domcontentloaded', timeout=30000)
+            with rate_limit():
+                response = page.goto('https://www.linkedin.com/login', wait_until='domcontentloaded', timeout=30000)
             if response:
-                print(f"  → Page loaded (Status: {response.status})")
+                logger.debug("  → Page loaded (Status: %s)", response.status)
             random_delay(2, 4)
         except Exception as e:
-            print(f"  ⚠ Navigation error: {str(e)}")
-            print("  → Checking if page loaded anyway...")
+            logger.warning("  ⚠ Navigation error: %s", e)
+            logger.debug("  → Checking if page loaded anyway...")
             random_delay(2, 3)
             if 'linkedin.com' not in page.url:
                 raise Exception("Failed to navigate to LinkedIn login page")
@@ -77,9 +193,9 @@ def login_to_linkedin(page: Page, email: str, password: str) -> bool:
         
         # Fill email with human-like typing
         email_selector = 'input#username'  # REPLACE WITH ACTUAL SELECTOR
-        print(f"→ Typing email...")
+        logger.info("→ Typing email...")
         human_type(page, email_selector, email)
-        print(f"✓ Filled email: {email}")
+        logger.info("✓ Filled email: %s", email)
         
         # Random mouse movement
         move_mouse_randomly(page)
@@ -87,9 +203,9 @@ def login_to_linkedin(page: Page, email: str, password: str) -> bool:
         
         # Fill password with human-like typing
         password_selector = 'input#password'  # REPLACE WITH ACTUAL SELECTOR
-        print("→ Typing password...")
+        logger.info("→ Typing password...")
         human_type(page, password_selector, password)
-        print("✓ Filled password")
+        logger.info("✓ Filled password")
         
         # Random delay before clicking login
         random_delay(1, 2)
@@ -97,78 +213,236 @@ def login_to_linkedin(page: Page, email: str, password: str) -> bool:
         
         # Click login button
         login_button_selector = 'button[type="submit"]'  # REPLACE WITH ACTUAL SELECTOR
-        print("→ Clicking login button...")
-        page.click(login_button_selector)
-        print("✓ Clicked login button")
-        
-        # Wait for navigation after login (with flexible timeout handling)
-        print("→ Waiting for login to complete...")
+        logger.info("→ Clicking login button...")
+        move_mouse_to(page, login_button_selector)
+        with rate_limit():
+            page.click(login_button_selector)
+        logger.info("✓ Clicked login button")
+        
+        # Wait until the login lands somewhere meaningful, instead of sleeping a fixed time after the page loads
+        logger.info("→ Waiting for login to complete...")
         try:
-            # Try to wait for navigation, but don't fail if it times out
-            page.wait_for_load_state('domcontentloaded', timeout=10000)
-            random_delay(2, 3)
-        except Exception as e:
-            print(f"  ⚠ Timeout waiting for page load, but continuing...")
-            random_delay(2, 3)
-        
-        # Additional wait for any async content
-        random_delay(2, 4)
+            page.wait_for_url(LOGIN_RESULT_URL_RE, wait_until='domcontentloaded', timeout=LOGIN_RESULT_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logger.warning("  ⚠ Timeout waiting for page load, but continuing...")
         
         # Check if login was successful
         current_url = page.url
-        print(f"→ Current URL: {current_url}")
+        logger.info("→ Current URL: %s", current_url)
         
         if 'feed' in current_url or 'mynetwork' in current_url:
-            print("✓ Login successful!")
+            logger.info("✓ Login successful!")
             return True
         elif 'checkpoint' in current_url or 'challenge' in current_url:
-            print("⚠ LinkedIn security challenge detected!")
-            print("→ Please complete the CAPTCHA/verification manually...")
-            input("Press Enter after completing the challenge...")
+            logger.warning("⚠ LinkedIn security challenge detected!")
+            logger.info("→ Please complete the CAPTCHA/verification manually in the browser...")
             
-            # Check again after manual intervention
-            random_delay(1, 2)
-            if 'feed' in page.url or 'mynetwork' in page.url:
-                print("✓ Login successful after challenge!")
+            # Continue as soon as the browser lands on the feed, instead of waiting for Enter
+            try:
+                page.wait_for_url(CHALLENGE_DONE_URL_RE, timeout=CHALLENGE_TIMEOUT_MS)
+                logger.info("✓ Login successful after challenge!")
                 return True
-            else:
-                print("✗ Login failed after challenge")
+            except PlaywrightTimeoutError:
+                logger.error("✗ Login failed after challenge")
                 return False
         elif 'login' in current_url:
-            print("⚠ Still on login page. Login may have failed.")
+            logger.warning("⚠ Still on login page. Login may have failed.")
             return False
         else:
             # If we're not on login page, might be logged in - check for feed elements
-            print("⚠ URL doesn't match expected patterns. Checking for feed elements...")
+            logger.warning("⚠ URL doesn't match expected patterns. Checking for feed elements...")
             try:
                 # Check if feed elements are present
                 feed_check = page.locator('div.scaffold-finite-scroll__content, div.feed-shared-update-v2').first
                 if feed_check.count() > 0:
-                    print("✓ Feed elements found - assuming login successful!")
+                    logger.info("✓ Feed elements found - assuming login successful!")
                     return True
                 else:
-                    print("⚠ No feed elements found. Current URL:", current_url)
+                    logger.warning("⚠ No feed elements found. Current URL: %s", current_url)
                     return False
             except:
-                print("⚠ Could not verify login status. Current URL:", current_url)
+                logger.warning("⚠ Could not verify login status. Current URL: %s", current_url)
                 return False
             
     except Exception as e:
-        print(f"⚠ Error during login: {str(e)}")
+        logger.warning("⚠ Error during login: %s", e)
         # Even if there was an error, check if we're logged in
         try:
             current_url = page.url
             if 'feed' in current_url or 'mynetwork' in current_url:
-                print("✓ However, appears to be logged in based on URL. Proceeding...")
+                logger.info("✓ However, appears to be logged in based on URL. Proceeding...")
                 return True
             else:
-                print("✗ Login failed and not on feed page")
+                logger.error("✗ Login failed and not on feed page")
                 return False
         except:
-            print("✗ Login failed and could not verify status")
+            logger.error("✗ Login failed and could not verify status")
             return False
 
 
+# LinkedIn's accessibility "hashtag" label on its own line before each #tag, and 3+ newline runs
+HASHTAG_LABEL_RE = re.compile(r'hashtag\n|\nhashtag')
+NEWLINE_RUN_RE = re.compile(r'\n{3,}')
+
+POST_TEXT_SELECTOR = 'div.update-components-text, div.feed-shared-inline-show-more-text'
+SEE_MORE_SELECTOR = 'button.feed-shared-inline-show-more-text__see-more-less-toggle'
+FEED_POST_SELECTOR = 'div.feed-shared-update-v2'
+# How long a scroll may take to load more posts before the feed counts as exhausted
+SCROLL_GROWTH_TIMEOUT_MS = 4000
+
+# Reads every raw field of a post element in one browser-side pass (one CDP round-trip
+# instead of a count()/inner_text()/get_attribute() call per field); cleanup happens in Python.
+# A field is null when its element is missing
+EXTRACT_POST_JS = """el => {
+    const text = (selector) => {
+        const node = el.querySelector(selector);
+        return node ? node.innerText.trim() : null;
+    };
+    // "1,234" / "1.2K" / "4M" -> integer; null when the count is missing or unreadable
+    const count = (value) => {
+        const match = value && value.replace(/,/g, '').match(/^([\\d.]+)([KM]?)/i);
+        return match ? Math.round(parseFloat(match[1]) * ({'': 1, K: 1e3, M: 1e6}[match[2].toUpperCase()])) : null;
+    };
+    // Only valid URNs: the element's own, else the nearest activity URN on it or its parents
+    let urn = el.getAttribute('data-urn') || '';
+    if (!urn.startsWith('urn:li:')) {
+        urn = '';
+        for (let current = el, i = 0; i < 5 && current; i++, current = current.parentElement) {
+            const value = current.getAttribute('data-urn');
+            if (value && value.startsWith('urn:li:activity:')) {
+                urn = value;
+                break;
+            }
+        }
+    }
+    const link = el.querySelector('a.update-components-actor__meta-link');
+    const img = el.querySelector('img.update-components-image__image, img.ivm-view-attr__img--centered');
+    return {
+        post_urn: urn,
+        author_name: text('span.update-components-actor__title span[dir="ltr"], span.update-components-actor__title')
+            ?? text('a.update-components-actor__meta-link span.update-components-actor__title span'),
+        author_href: link ? (link.getAttribute('href') || '') : null,
+        post_text: text('""" + POST_TEXT_SELECTOR + """'),
+        see_more: el.querySelector('""" + SEE_MORE_SELECTOR + """') !== null,
+        image_url: img ? (img.getAttribute('src') || '') : '',
+        reactions_count: count(text('span.social-details-social-counts__reactions-count, button[data-reaction-details] span')),
+        timestamp: text('span.update-components-actor__sub-description'),
+        author_title: text('span.update-components-actor__description')
+    };
+}"""
+
+
+# Every feed post in one evaluate: the same post selection as before (posts with activity URNs,
+# else all feed updates deduplicated by URN/id), with repeated URNs dropped before the max_posts cut,
+# each read with EXTRACT_POST_JS
+EXTRACT_FEED_JS = """([selector, fallbackSelector, maxPosts]) => {
+    const extract = """ + EXTRACT_POST_JS + """;
+    let elements = Array.from(document.querySelectorAll(selector));
+    if (elements.length < 3) {
+        const seen = new Set();
+        const unique = [];
+        for (const el of document.querySelectorAll(fallbackSelector)) {
+            const id = el.getAttribute('data-urn') || el.id || '';
+            if (id && !seen.has(id)) {
+                seen.add(id);
+                unique.push(el);
+            }
+        }
+        if (unique.length) {
+            elements = unique;
+        }
+    }
+    // Drop repeats of the same URN before extracting, so duplicates are never read or sent back
+    const seenUrns = new Set();
+    const unique = elements.filter(el => {
+        const urn = el.getAttribute('data-urn');
+        if (!urn) {
+            return true;
+        }
+        if (seenUrns.has(urn)) {
+            return false;
+        }
+        seenUrns.add(urn);
+        return true;
+    });
+    return {
+        found: elements.length,
+        posts: unique.slice(0, maxPosts).map(extract)
+    };
+}"""
+
+# Clicks every "see more" toggle at once and returns how many it expanded
+EXPAND_ALL_JS = """() => {
+    const buttons = document.querySelectorAll('""" + SEE_MORE_SELECTOR + """');
+    buttons.forEach(button => button.click());
+    return buttons.length;
+}"""
+
+
+def postproc_author_name(value: str) -> str:
+    """First line only, without the "• 2nd" / "Verified" suffixes"""
+    author_name = value.split('\n', 1)[0].strip()
+    return author_name.split('•', 1)[0].strip().split('Verified', 1)[0].strip()
+
+
+def postproc_post_text(value: str) -> str:
+    """Drop LinkedIn's "hashtag" labels and collapse runs of blank lines"""
+    return NEWLINE_RUN_RE.sub('\n\n', HASHTAG_LABEL_RE.sub('', value))
+
+
+def postproc_author_title(value: str) -> str:
+    """First 3 distinct non-empty lines, joined with ' | '"""
+    title_lines = dict.fromkeys(line.strip() for line in value.split('\n') if line.strip())
+    return ' | '.join(list(title_lines)[:3])
+
+
+# (field, cleanup) for every raw text field of EXTRACT_POST_JS; a missing (null/empty) field becomes ''
+TEXT_FIELD_SPECS = [
+    ('author_name', postproc_author_name),
+    ('post_text', postproc_post_text),
+    ('timestamp', str),
+    ('author_title', postproc_author_title),
+]
+
+
+def clean_post_fields(raw: Dict) -> Dict:
+    """
+    Turn the raw fields from EXTRACT_POST_JS into the post data saved to CSV
+    
+    Args:
+        raw: Raw field dict read in the browser
+    
+    Returns:
+        dict: Post data
+    """
+    post_data = {'post_urn': raw['post_urn']}
+    
+    for field, postproc in TEXT_FIELD_SPECS:
+        value = raw[field]
+        post_data[field] = postproc(value) if value else ''
+    
+    # Author Profile URL (to get URN from URL)
+    author_url = raw['author_href']
+    if author_url and '/in/' in author_url:
+        profile_slug = author_url.split('/in/')[-1].split('?')[0]
+        post_data['author_profile_url'] = f"https://www.linkedin.com{author_url}" if author_url.startswith('/') else author_url
+        post_data['author_urn'] = profile_slug  # Simplified, actual URN would need API
+    else:
+        post_data['author_profile_url'] = author_url or ''
+        post_data['author_urn'] = ''
+    
+    post_data['image_url'] = raw['image_url']
+    
+    # Engagement Metrics (reactions already parsed to an int in the browser)
+    post_data['reactions_count'] = raw['reactions_count'] or 0
+    post_data['comments_count'] = 'N/A'  # LinkedIn often doesn't show count directly
+    
+    # Add scrape timestamp
+    post_data['scraped_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    return post_data
+
+
 def extract_post_data(page: Page, post_element) -> Optional[Dict]:
     """
     Extract data from a single LinkedIn post element
@@ -181,196 +455,59 @@ def extract_post_data(page: Page, post_element) -> Optional[Dict]:
         dict: Post data or None if extraction fails
     """
     try:
-        post_data = {}
+        raw = post_element.evaluate(EXTRACT_POST_JS)
         
-        # Extract Post URN (only valid URNs, skip ember IDs)
-        post_urn = post_element.get_attribute('data-urn') or ''
-        # Filter out invalid URNs (ember IDs, etc.)
-        if post_urn and (post_urn.startswith('urn:li:') or post_urn.startswith('urn:li:activity:')):
-            post_data['post_urn'] = post_urn
-        else:
-            # Try to get from parent or other attributes
+        # Click "see more" first if truncated, then re-read just the text
+        if raw['post_text'] is not None and raw['see_more']:
             try:
-                parent_urn = post_element.evaluate("""el => {
-                    let current = el;
-                    for (let i = 0; i < 5 && current; i++) {
-                        if (current.getAttribute('data-urn') && current.getAttribute('data-urn').startsWith('urn:li:activity:')) {
-                            return current.getAttribute('data-urn');
-                        }
-                        current = current.parentElement;
-                    }
-                    return '';
-                }""")
-                post_data['post_urn'] = parent_urn or ''
+                post_element.locator(SEE_MORE_SELECTOR).first.click()
+                random_delay(0.5, 1.0)
+                raw['post_text'] = post_element.locator(POST_TEXT_SELECTOR).first.inner_text().strip()
             except:
-                post_data['post_urn'] = ''
-        
-        # Extract Author Name (get first line only, clean up)
-        try:
-            # Try multiple selectors to find author name
-            author_name_elem = post_element.locator('span.update-components-actor__title span[dir="ltr"], span.update-components-actor__title').first
-            if author_name_elem.count() == 0:
-                author_name_elem = post_element.locator('a.update-components-actor__meta-link span.update-components-actor__title span').first
-            
-            if author_name_elem.count() > 0:
-                author_text = author_name_elem.inner_text().strip()
-                # Get first line only, remove extra whitespace and newlines
-                author_name = author_text.split('\n')[0].strip()
-                # Remove any "Verified" or other suffixes
-                author_name = author_name.split('•')[0].strip()
-                author_name = author_name.split('Verified')[0].strip()
-                post_data['author_name'] = author_name
-            else:
-                post_data['author_name'] = ''
-        except:
-            post_data['author_name'] = ''
-        
-        # Extract Author Profile URL (to get URN from URL)
-        try:
-            author_link_elem = post_element.locator('a.update-components-actor__meta-link').first
-            if author_link_elem.count() > 0:
-                author_url = author_link_elem.get_attribute('href') or ''
-                # Extract URN from URL if possible
-                if '/in/' in author_url:
-                    profile_slug = author_url.split('/in/')[-1].split('?')[0]
-                    post_data['author_profile_url'] = f"https://www.linkedin.com{author_url}" if author_url.startswith('/') else author_url
-                    post_data['author_urn'] = profile_slug  # Simplified, actual URN would need API
-                else:
-                    post_data['author_profile_url'] = author_url
-                    post_data['author_urn'] = ''
-            else:
-                post_data['author_profile_url'] = ''
-                post_data['author_urn'] = ''
-        except:
-            post_data['author_profile_url'] = ''
-            post_data['author_urn'] = ''
-        
-        # Extract Post Text
-        try:
-            # Try to get full text (may need to click "see more" if truncated)
-            text_elem = post_element.locator('div.update-components-text, div.feed-shared-inline-show-more-text').first
-            if text_elem.count() > 0:
-                # Check if there's a "see more" button
-                see_more_btn = post_element.locator('button.feed-shared-inline-show-more-text__see-more-less-toggle').first
-                if see_more_btn.count() > 0:
-                    try:
-                        see_more_btn.click()
-                        random_delay(0.5, 1.0)
-                    except:
-                        pass
-                
-                post_text = text_elem.inner_text().strip()
-                # Clean up "hashtag" prefix that appears before hashtags
-                post_text = post_text.replace('hashtag\n#', '#').replace('hashtag\n', '')
-                post_text = post_text.replace('\nhashtag\n', '\n').replace('\nhashtag', '')
-                # Clean up multiple newlines
-                post_text = re.sub(r'\n{3,}', '\n\n', post_text)
-                post_data['post_text'] = post_text
-            else:
-                post_data['post_text'] = ''
-        except:
-            post_data['post_text'] = ''
-        
-        # Extract Image URL
-        try:
-            img_elem = post_element.locator('img.update-components-image__image, img.ivm-view-attr__img--centered').first
-            if img_elem.count() > 0:
-                post_data['image_url'] = img_elem.get_attribute('src') or ''
-            else:
-                post_data['image_url'] = ''
-        except:
-            post_data['image_url'] = ''
-        
-        # Extract Engagement Metrics
-        try:
-            # Reactions count
-            reactions_elem = post_element.locator('span.social-details-social-counts__reactions-count, button[data-reaction-details] span').first
-            if reactions_elem.count() > 0:
-                reactions_text = reactions_elem.inner_text().strip()
-                # Parse number (handle "1", "1.2K", etc.)
-                post_data['reactions_count'] = reactions_text
-            else:
-                post_data['reactions_count'] = '0'
-        except:
-            post_data['reactions_count'] = '0'
-        
-        try:
-            # Comments count (if visible)
-            comments_elem = post_element.locator('button[aria-label*="Comment"], button.comment-button').first
-            if comments_elem.count() > 0:
-                # Comments count might be in a separate element
-                post_data['comments_count'] = 'N/A'  # LinkedIn often doesn't show count directly
-            else:
-                post_data['comments_count'] = 'N/A'
-        except:
-            post_data['comments_count'] = 'N/A'
-        
-        # Extract Timestamp
-        try:
-            timestamp_elem = post_element.locator('span.update-components-actor__sub-description').first
-            if timestamp_elem.count() > 0:
-                post_data['timestamp'] = timestamp_elem.inner_text().strip()
-            else:
-                post_data['timestamp'] = ''
-        except:
-            post_data['timestamp'] = ''
+                pass
         
-        # Extract Author Title/Description (get first line only, no duplicates)
-        try:
-            author_desc_elem = post_element.locator('span.update-components-actor__description').first
-            if author_desc_elem.count() > 0:
-                title_text = author_desc_elem.inner_text().strip()
-                # Get first line only, remove duplicates
-                title_lines = [line.strip() for line in title_text.split('\n') if line.strip()]
-                if title_lines:
-                    # Remove duplicates while preserving order
-                    seen = set()
-                    unique_lines = []
-                    for line in title_lines:
-                        if line not in seen:
-                            seen.add(line)
-                            unique_lines.append(line)
-                    post_data['author_title'] = ' | '.join(unique_lines[:3])  # Max 3 lines
-                else:
-                    post_data['author_title'] = ''
-            else:
-                post_data['author_title'] = ''
-        except:
-            post_data['author_title'] = ''
-        
-        # Add scrape timestamp
-        post_data['scraped_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        return post_data
+        return clean_post_fields(raw)
         
     except Exception as e:
-        print(f"  ⚠ Error extracting post data: {str(e)}")
+        logger.warning("  ⚠ Error extracting post data: %s", e)
         return None
 
 
-def scroll_feed(page: Page, scroll_count: int = 3):
+def scroll_feed(page: Page, scroll_count: int = 3, target_count: Optional[int] = None):
     """
-    Scroll the LinkedIn feed to load more posts
+    Scroll the LinkedIn feed to load more posts, stopping early once the feed stops growing
     
     Args:
         page: Playwright page object
-        scroll_count: Number of times to scroll
+        scroll_count: Maximum number of times to scroll
+        target_count: Stop as soon as this many posts are loaded
     """
-    print(f"→ Scrolling feed {scroll_count} times...")
+    logger.info("→ Scrolling feed (up to %s times)...", scroll_count)
     
     for i in range(scroll_count):
-        # Scroll down
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        random_delay(2, 4)
+        if target_count and page.locator(FEED_POST_SELECTOR).count() >= target_count:
+            logger.debug("  ✓ %s+ posts loaded, stopping scroll", target_count)
+            break
+        
+        # Scroll down, then wait for new posts to grow the page instead of sleeping a fixed time
+        height = page.evaluate("document.body.scrollHeight")
+        with rate_limit():
+            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            page.wait_for_function(f"document.body.scrollHeight > {height}", timeout=SCROLL_GROWTH_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logger.debug("  ✓ Feed stopped growing after %s scroll(s)", i+1)
+            break
         
         # Random mouse movement
         move_mouse_randomly(page)
         random_delay(0.5, 1.5)
         
-        print(f"  ✓ Scroll {i+1}/{scroll_count} completed")
+        logger.debug("  ✓ Scroll %s/%s completed", i+1, scroll_count)
 
 
-def scrape_linkedin_feed(page: Page, max_posts: int = 10, scroll_count: int = 3) -> List[Dict]:
+def scrape_linkedin_feed(page: Page, max_posts: int = 10, scroll_count: int = 3,
+                         on_post: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
     """
     Step 2: Scrape LinkedIn feed posts
     
@@ -378,112 +515,133 @@ def scrape_linkedin_feed(page: Page, max_posts: int = 10, scroll_count: int = 3)
         page: Playwright page object
         max_posts: Maximum number of posts to scrape
         scroll_count: Number of times to scroll the feed
+        on_post: Called with each kept post as soon as it's extracted (e.g. to stream it to CSV)
     
     Returns:
         list: List of post data dictionaries
     """
-    print("\nStep 2: Scraping LinkedIn feed...")
+    logger.info("Step 2: Scraping LinkedIn feed...")
     
     try:
         # Navigate to feed if not already there
         if 'feed' not in page.url:
-            print("→ Navigating to LinkedIn feed...")
+            logger.info("→ Navigating to LinkedIn feed...")
             try:
-                response = page.goto('https://www.linkedin.com/feed', wait_until='domcontentloaded', timeout=30000)
+                with rate_limit():
+                    response = page.goto('https://www.linkedin.com/feed', wait_until='domcontentloaded', timeout=30000)
                 if response:
-                    print(f"  → Feed page loaded (Status: {response.status})")
+                    logger.debug("  → Feed page loaded (Status: %s)", response.status)
                 random_delay(3, 5)
             except Exception as e:
-                print(f"  ⚠ Navigation error: {str(e)}")
-                print("  → Checking if page loaded anyway...")
+                logger.warning("  ⚠ Navigation error: %s", e)
+                logger.debug("  → Checking if page loaded anyway...")
                 random_delay(2, 3)
                 if 'feed' not in page.url:
                     raise Exception("Failed to navigate to LinkedIn feed")
         
         # Wait for feed to load
-        print("→ Waiting for feed to load...")
+        logger.info("→ Waiting for feed to load...")
         page.wait_for_selector('div.scaffold-finite-scroll__content', timeout=10000)
         random_delay(2, 3)
         
         # Scroll to load more posts
-        scroll_feed(page, scroll_count)
+        scroll_feed(page, scroll_count, target_count=max_posts)
         
-        # Find all post containers (prioritize actual posts with data-urn)
-        print("→ Extracting posts...")
-        # First try to get posts with proper URNs
-        post_selector = 'div[data-urn*="activity"], div.feed-shared-update-v2[data-urn], div.occludable-update[data-urn]'
-        post_elements = page.locator(post_selector).all()
+        # Expand every truncated post at once, then read all posts in a single evaluate
+        logger.info("→ Extracting posts...")
+        if page.evaluate(EXPAND_ALL_JS):
+            # Let the expanded text render before reading it
+            random_delay(0.5, 1.0)
         
-        # If not enough, get all feed-shared-update-v2
-        if len(post_elements) < 3:
-            all_posts = page.locator('div.feed-shared-update-v2').all()
-            # Combine and deduplicate
-            seen_ids = set()
-            unique_posts = []
-            for post in all_posts:
-                try:
-                    post_id = post.get_attribute('data-urn') or post.get_attribute('id') or ''
-                    if post_id and post_id not in seen_ids:
-                        seen_ids.add(post_id)
-                        unique_posts.append(post)
-                except:
-                    continue
-            post_elements = unique_posts if unique_posts else post_elements
+        # First try to get posts with proper URNs; if not enough, all feed-shared-update-v2
+        post_selector = 'div[data-urn*="activity"], div.feed-shared-update-v2[data-urn], div.occludable-update[data-urn]'
+        feed = page.evaluate(EXTRACT_FEED_JS, [post_selector, FEED_POST_SELECTOR, max_posts])
         
-        print(f"  → Found {len(post_elements)} posts")
+        logger.info("  → Found %s posts", feed['found'])
         
         posts_data = []
-        processed_urns = set()  # Track processed posts to avoid duplicates
         
-        for idx, post_elem in enumerate(post_elements[:max_posts]):
-            try:
-                # Get post URN to check for duplicates
-                post_urn = post_elem.get_attribute('data-urn') or ''
-                
-                if post_urn and post_urn in processed_urns:
-                    continue
-                
-                if post_urn:
-                    processed_urns.add(post_urn)
-                
-                print(f"  → Extracting post {idx+1}/{min(len(post_elements), max_posts)}...")
-                
-                # Extract post data
-                post_data = extract_post_data(page, post_elem)
-                
-                # Only add posts with meaningful data (has post text or valid URN)
-                if post_data:
-                    has_content = (
-                        post_data.get('post_text', '').strip() or 
-                        post_data.get('post_urn', '').startswith('urn:li:activity:') or
-                        post_data.get('author_name', '').strip()
-                    )
-                    
-                    if has_content:
-                        posts_data.append(post_data)
-                        author = post_data.get('author_name', 'Unknown')[:30]
-                        text_preview = post_data.get('post_text', '')[:50].replace('\n', ' ')
-                        print(f"    ✓ Extracted: {author} - {text_preview}...")
-                    else:
-                        print(f"    ⚠ Skipped post {idx+1} (no meaningful content)")
-                else:
-                    print(f"    ⚠ Skipped post {idx+1} (no data extracted)")
-                
-                # Random delay between extractions
-                random_delay(0.5, 1.5)
-                
-            except Exception as e:
-                print(f"    ✗ Error processing post {idx+1}: {str(e)}")
-                continue
+        # Posts arrive already deduplicated by their own URN
+        for idx, raw in enumerate(feed['posts']):
+            post_data = clean_post_fields(raw)
+            
+            # Only add posts with meaningful data (has post text or valid URN)
+            has_content = (
+                post_data.get('post_text', '').strip() or 
+                post_data.get('post_urn', '').startswith('urn:li:activity:') or
+                post_data.get('author_name', '').strip()
+            )
+            
+            if has_content:
+                posts_data.append(post_data)
+                if on_post:
+                    on_post(post_data)
+                author = post_data.get('author_name', 'Unknown')[:30]
+                text_preview = post_data.get('post_text', '')[:50].replace('\n', ' ')
+                logger.debug("    ✓ Extracted: %s - %s...", author, text_preview)
+            else:
+                logger.debug("    ⚠ Skipped post %s (no meaningful content)", idx+1)
         
-        print(f"\n✓ Successfully extracted {len(posts_data)} posts")
+        logger.info("✓ Successfully extracted %s posts", len(posts_data))
         return posts_data
         
     except Exception as e:
-        print(f"✗ Feed scraping failed: {str(e)}")
+        logger.error("✗ Feed scraping failed: %s", e)
         return []
 
 
+# Newlines become spaces in every CSV column except post_text (one translate pass per value)
+CSV_NEWLINES_TO_SPACES = str.maketrans({'\n': ' ', '\r': ' '})
+
+# CSV columns
+CSV_FIELDNAMES = [
+    'post_urn',
+    'author_urn',
+    'author_name',
+    'author_title',
+    'author_profile_url',
+    'post_text',
+    'image_url',
+    'reactions_count',
+    'comments_count',
+    'timestamp',
+    'scraped_at'
+]
+
+
+def open_posts_csv(filename: str):
+    """
+    Create output/<filename> and write the CSV header
+    
+    Returns:
+        tuple: (open file, csv.DictWriter, filepath); the caller closes the file
+    """
+    # Create output directory if it doesn't exist
+    output_dir = 'output'
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
+    
+    # Write to CSV with proper escaping
+    csvfile = open(filepath, 'w', newline='', encoding='utf-8')
+    writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES, quoting=csv.QUOTE_MINIMAL)
+    writer.writeheader()
+    return csvfile, writer, filepath
+
+
+def write_post_row(writer, post: Dict):
+    """Write one post, making sure all fields exist and cleaning newlines"""
+    row = {}
+    for field in CSV_FIELDNAMES:
+        value = post.get(field, '')
+        # For post_text, keep newlines (the csv module quotes them properly)
+        if field == 'post_text':
+            row[field] = value
+        else:
+            # Replace newlines with spaces for other fields
+            row[field] = str(value).translate(CSV_NEWLINES_TO_SPACES).strip()
+    writer.writerow(row)
+
+
 def save_posts_to_csv(posts: List[Dict], filename: str = 'linkedin_posts.csv'):
     """
     Save scraped posts to CSV file
@@ -493,187 +651,317 @@ def save_posts_to_csv(posts: List[Dict], filename: str = 'linkedin_posts.csv'):
         filename: Output CSV filename
     """
     if not posts:
-        print("⚠ No posts to save")
+        logger.warning("⚠ No posts to save")
         return
     
-    print(f"\n→ Saving {len(posts)} posts to {filename}...")
-    
-    # Define CSV columns
-    fieldnames = [
-        'post_urn',
-        'author_urn',
-        'author_name',
-        'author_title',
-        'author_profile_url',
-        'post_text',
-        'image_url',
-        'reactions_count',
-        'comments_count',
-        'timestamp',
-        'scraped_at'
-    ]
+    logger.info("→ Saving %s posts to %s...", len(posts), filename)
     
     try:
-        # Create output directory if it doesn't exist
-        output_dir = 'output'
-        os.makedirs(output_dir, exist_ok=True)
-        filepath = os.path.join(output_dir, filename)
-        
-        # Write to CSV with proper escaping
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
-            writer.writeheader()
-            
+        csvfile, writer, filepath = open_posts_csv(filename)
+        with csvfile:
             for post in posts:
-                # Ensure all fields exist and clean newlines for CSV
-                row = {}
-                for field in fieldnames:
-                    value = post.get(field, '')
-                    # Replace newlines with spaces for better CSV readability (or keep them if needed)
-                    # For post_text, we'll keep newlines but ensure proper CSV escaping
-                    if field == 'post_text':
-                        # Keep newlines but ensure proper CSV formatting
-                        row[field] = value
-                    else:
-                        # Replace newlines with spaces for other fields
-                        row[field] = str(value).replace('\n', ' ').replace('\r', ' ').strip()
-                writer.writerow(row)
+                write_post_row(writer, post)
         
-        print(f"✓ Posts saved to {filepath}")
+        logger.info("✓ Posts saved to %s", filepath)
         return filepath
         
     except Exception as e:
-        print(f"✗ Error saving CSV: {str(e)}")
+        logger.error("✗ Error saving CSV: %s", e)
         return None
 
 
+BROWSER_ARGS = [
+    '--start-maximized',
+    '--disable-blink-features=AutomationControlled',  # Hide automation
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    # Removed --disable-web-security as it can cause network issues
+    # Removed --disable-features=IsolateOrigins,site-per-process as it can block network
+]
+
+# Realistic headers and settings for every browser context
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
+    # Ensure network is enabled
+    'offline': False,
+    'java_script_enabled': True,
+    'locale': 'en-US',
+    'timezone_id': 'America/New_York',
+    'permissions': ['geolocation'],
+    # Network settings
+    'ignore_https_errors': False,
+    'bypass_csp': False,
+    'extra_http_headers': {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+        'Accept-Encoding': 'gzip, deflate, br, zstd',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Cache-Control': 'no-cache',
+        'Pragma': 'no-cache',
+        'Sec-Ch-Ua': '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
+        'Sec-Ch-Ua-Mobile': '?0',
+        'Sec-Ch-Ua-Platform': '"Windows"',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1',
+        'Upgrade-Insecure-Requests': '1'
+    }
+}
+
+# Hide webdriver property
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    
+    // Override the plugins property
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    
+    // Override the languages property
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en']
+    });
+    
+    // Add chrome object
+    window.chrome = {
+        runtime: {}
+    };
+    
+    // Override permissions
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+"""
+
+# Most browsers kept alive at once when scraping several accounts
+MAX_BROWSERS = 3
+
+
+def launch_browser(p, headless: bool):
+    """Launch Chromium with anti-detection settings"""
+    logger.info("→ Launching browser (%s)...", 'headless' if headless else 'headful')
+    return p.chromium.launch(
+        headless=headless,
+        args=[*(['--headless=new'] if headless else []), *BROWSER_ARGS]
+    )
+
+
+# Resources the scraper never needs: image URLs are read from the DOM, so the files themselves aren't downloaded.
+# Stylesheets are still loaded since the feed's layout (and lazy loading) depends on them.
+# Set LINKEDIN_BLOCK_ASSETS=0 to load everything (e.g. to solve an image captcha by hand).
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+BLOCK_ASSETS = os.getenv('LINKEDIN_BLOCK_ASSETS', '1') != '0'
+
+
+def block_unneeded_resources(route):
+    """Abort images, media and fonts; let every other request through"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def prepare_context(context):
+    """Apply the stealth patches and resource blocking to a fresh context"""
+    context.add_init_script(STEALTH_SCRIPT)
+    if BLOCK_ASSETS:
+        context.route('**/*', block_unneeded_resources)
+    return context
+
+
+def new_scraper_context(browser, storage_state: Optional[str] = None):
+    """Create a browser context with realistic headers, the stealth patches and an optional saved session"""
+    return prepare_context(browser.new_context(storage_state=storage_state, **CONTEXT_OPTIONS))
+
+
+# Chrome profile kept between runs of main(): cookies, HTTP cache, IndexedDB and service workers
+# survive, so a warm run skips the login and most of LinkedIn's bundle downloads
+USER_DATA_DIR = os.getenv('LINKEDIN_USER_DATA_DIR', 'chrome_profile')
+
+
+def launch_persistent_scraper_context(p, headless: bool, user_data_dir: str = USER_DATA_DIR):
+    """Launch Chromium on a persistent profile; closing the returned context closes the browser"""
+    logger.info("→ Launching browser (%s, profile: %s)...", 'headless' if headless else 'headful', user_data_dir)
+    return prepare_context(p.chromium.launch_persistent_context(
+        user_data_dir,
+        headless=headless,
+        args=[*(['--headless=new'] if headless else []), *BROWSER_ARGS],
+        **CONTEXT_OPTIONS
+    ))
+
+
+def ensure_logged_in(page: Page, context, email: str, password: str, auth_state_path: str = AUTH_STATE_PATH) -> bool:
+    """
+    Reuse the context's saved session if it's still valid, otherwise log in and save the new session
+    
+    Args:
+        page: Playwright page object
+        context: Browser context the page belongs to
+        email: LinkedIn account email
+        password: LinkedIn account password
+        auth_state_path: Where this account's storage state is saved
+    
+    Returns:
+        bool: True if logged in
+    """
+    if os.path.exists(auth_state_path) and has_valid_session(page):
+        logger.info("✓ Reusing saved LinkedIn session")
+        return True
+    
+    if login_to_linkedin(page, email, password):
+        context.storage_state(path=auth_state_path)
+        logger.info("✓ Saved session to %s", auth_state_path)
+        return True
+    return False
+
+
+def auth_state_path_for(email: str) -> str:
+    """Storage state file for one account when several are scraped"""
+    return f"linkedin_auth_{re.sub(r'[^A-Za-z0-9]+', '_', email)}.json"
+
+
+def scrape_account(browser, email: str, password: str, auth_state_path: str = AUTH_STATE_PATH,
+                   max_posts: int = 20, scroll_count: int = 5) -> List[Dict]:
+    """
+    Log one account in (or reuse its session) and scrape its feed in a fresh context of a shared browser
+    
+    Returns:
+        list: Scraped posts (empty if login failed)
+    """
+    context = new_scraper_context(browser, auth_state_path if os.path.exists(auth_state_path) else None)
+    try:
+        page = context.new_page()
+        if not ensure_logged_in(page, context, email, password, auth_state_path):
+            logger.error("✗ Login failed for %s", email)
+            return []
+        return scrape_linkedin_feed(page, max_posts=max_posts, scroll_count=scroll_count)
+    finally:
+        context.close()
+
+
+def scrape_accounts(accounts: List[tuple], max_browsers: int = MAX_BROWSERS, headless: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Scrape several accounts with at most max_browsers browsers; each browser is launched once
+    and serves queued accounts one after another, each in its own context
+    
+    Args:
+        accounts: (email, password) tuples
+        max_browsers: Most browsers alive at once (extra accounts wait in the queue)
+        headless: Launch the pooled browsers headless (login challenges can't be solved by hand then)
+    
+    Returns:
+        dict: Scraped posts per account email
+    """
+    jobs = queue.Queue()
+    for account in accounts:
+        jobs.put(account)
+    results = {}
+    
+    def worker():
+        # Playwright's sync objects belong to the thread that created them, so each worker owns its browser
+        with sync_playwright() as p:
+            browser = launch_browser(p, headless)
+            try:
+                while True:
+                    try:
+                        email, password = jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        results[email] = scrape_account(browser, email, password, auth_state_path_for(email))
+                    except Exception as e:
+                        logger.error("✗ Error scraping %s: %s", email, e)
+                        results[email] = []
+            finally:
+                browser.close()
+    
+    workers = [threading.Thread(target=worker) for _ in range(min(max_browsers, len(accounts)))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
 def main():
     """Main function to run the LinkedIn scraper"""
+    # Per-post and per-scroll detail is logged at DEBUG; LOG_LEVEL=DEBUG shows it, WARNING silences progress
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
     
     # Get credentials from environment variables
     LINKEDIN_EMAIL = os.getenv('LINKEDIN_EMAIL', 'your_email@example.com')
     LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD', 'your_password')
     
+    # Reuse the saved login session (kept in the persistent profile) when there is one
+    saved_session = os.path.exists(AUTH_STATE_PATH) and os.path.isdir(USER_DATA_DIR)
+    # Headless (cheaper, stealth patches still apply) once a session is saved; a first login
+    # may need a visible window for a manual challenge. HEADFUL=1 forces a visible browser
+    headless = saved_session and os.getenv('HEADFUL') != '1'
+    
     with sync_playwright() as p:
-        # Launch browser with anti-detection settings
-        print("→ Launching browser...")
-        browser = p.chromium.launch(
-            headless=False,  # Set to True for production (but may increase detection)
-            args=[
-                '--start-maximized',
-                '--disable-blink-features=AutomationControlled',  # Hide automation
-                '--disable-dev-shm-usage',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                # Removed --disable-web-security as it can cause network issues
-                # Removed --disable-features=IsolateOrigins,site-per-process as it can block network
-            ]
-        )
+        context = launch_persistent_scraper_context(p, headless)
         
-        # Create context with realistic headers and settings
-        context = browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
-            # Ensure network is enabled
-            offline=False,
-            java_script_enabled=True,
-            locale='en-US',
-            timezone_id='America/New_York',
-            permissions=['geolocation'],
-            # Network settings
-            ignore_https_errors=False,
-            bypass_csp=False,
-            extra_http_headers={
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br, zstd',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache',
-                'Sec-Ch-Ua': '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
-                'Sec-Ch-Ua-Mobile': '?0',
-                'Sec-Ch-Ua-Platform': '"Windows"',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Sec-Fetch-User': '?1',
-                'Upgrade-Insecure-Requests': '1'
-            }
-        )
-        
-        # Hide webdriver property
-        context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-            
-            // Override the plugins property
-            Object.defineProperty(navigator, 'plugins', {
-                get: () => [1, 2, 3, 4, 5]
-            });
-            
-            // Override the languages property
-            Object.defineProperty(navigator, 'languages', {
-                get: () => ['en-US', 'en']
-            });
-            
-            // Add chrome object
-            window.chrome = {
-                runtime: {}
-            };
-            
-            // Override permissions
-            const originalQuery = window.navigator.permissions.query;
-            window.navigator.permissions.query = (parameters) => (
-                parameters.name === 'notifications' ?
-                    Promise.resolve({ state: Notification.permission }) :
-                    originalQuery(parameters)
-            );
-        """)
-        
-        # Create new page
-        page = context.new_page()
+        # A persistent context opens with a blank tab; use it instead of a second one
+        page = context.pages[0] if context.pages else context.new_page()
         
         # Test network connectivity
         try:
-            print("→ Testing network connectivity...")
+            logger.info("→ Testing network connectivity...")
             response = page.goto('https://www.google.com', wait_until='domcontentloaded', timeout=10000)
             if response and response.status == 200:
-                print("✓ Network connectivity confirmed")
+                logger.info("✓ Network connectivity confirmed")
             else:
-                print("⚠ Network response status:", response.status if response else "No response")
+                logger.warning("⚠ Network response status: %s", response.status if response else "No response")
         except Exception as e:
-            print(f"⚠ Network test failed: {str(e)}")
-            print("⚠ Continuing anyway - check your internet connection")
+            logger.warning("⚠ Network test failed: %s", e)
+            logger.warning("⚠ Continuing anyway - check your internet connection")
         
         try:
-            # Step 1: Login
-            if login_to_linkedin(page, LINKEDIN_EMAIL, LINKEDIN_PASSWORD):
-                # Step 2: Scrape feed posts
-                posts = scrape_linkedin_feed(page, max_posts=20, scroll_count=5)
+            # Step 1: Login (skipped while the saved session is still valid)
+            if ensure_logged_in(page, context, LINKEDIN_EMAIL, LINKEDIN_PASSWORD):
+                # Steps 2 + 3: Scrape feed posts, writing each one to CSV as soon as it's extracted
+                # (the file is created with the first post, so nothing is left behind if there are none)
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f'linkedin_posts_{timestamp}.csv'
+                csv_out = []
+                
+                def stream_post(post: Dict):
+                    if not csv_out:
+                        csv_out.extend(open_posts_csv(filename))
+                    write_post_row(csv_out[1], post)
+                    csv_out[0].flush()
+                
+                try:
+                    posts = scrape_linkedin_feed(page, max_posts=20, scroll_count=5, on_post=stream_post)
+                finally:
+                    if csv_out:
+                        csv_out[0].close()
                 
-                # Step 3: Save to CSV
                 if posts:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = f'linkedin_posts_{timestamp}.csv'
-                    save_posts_to_csv(posts, filename)
-                    print(f"\n✓ Scraped and saved {len(posts)} posts successfully!")
+                    logger.info("✓ Posts saved to %s", csv_out[2])
+                    logger.info("✓ Scraped and saved %s posts successfully!", len(posts))
                 else:
-                    print("\n⚠ No posts were scraped")
+                    logger.warning("⚠ No posts were scraped")
                 
-                print("\n✓ All steps completed successfully!")
+                logger.info("✓ All steps completed successfully!")
             else:
-                print("\n✗ Process failed at login step")
+                logger.error("✗ Process failed at login step")
             
-            # Keep browser open for inspection
-            input("\nPress Enter to close browser...")
+            # Keep browser open for inspection (nothing to inspect when headless)
+            if not headless:
+                input("\nPress Enter to close browser...")
             
         except Exception as e:
-            print(f"\n✗ Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("✗ Error: %s", e)
         finally:
             context.close()
-            browser.close()
 
 
 if __name__ == "__main__":